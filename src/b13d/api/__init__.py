@@ -8,6 +8,8 @@ __all__ = [
     "core",
     "utils", 
     "constants",
+    "mesh",
+    "shape2d",
     "solid",
     "mock",
     "bpy",
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+    Zip archive of the files of a build, filled while the build runs
+
+    Files are queued as soon as they are written and compressed by a background
+    thread, overlapping with the generation of the next parts. A manifest.json with
+    the size, sha256 hash and metrics of every file closes the archive.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import queue
+import threading
+import zipfile
+
+MANIFEST = "manifest.json"
+# bytes read and compressed at a time
+ARCHIVE_CHUNK = 1 << 20
+
+
+class ExportArchive:
+    """ Zip archive written by a background thread """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest: dict[str, dict] = {}
+        self.error: BaseException = None
+        self._names: set[str] = set()
+        self._queue: queue.Queue = queue.Queue()
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._thread = threading.Thread(target=self._run, name="export-archive", daemon=True)
+        self._thread.start()
+
+    def add(self, fname: str, arcname: str = None, metrics: dict = None) -> None:
+        """ queue a written file, stored as arcname (its base name by default) """
+        arcname = arcname or os.path.basename(fname)
+        if arcname in self._names:
+            # exported again in another pass, keep the first copy
+            return
+        self._names.add(arcname)
+        self._queue.put((fname, arcname, metrics))
+
+    def close(self) -> str:
+        """ wait for the queued files, then write the manifest """
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is None:
+            self._zip.writestr(MANIFEST, json.dumps(self.manifest, indent=4, default=float))
+        self._zip.close()
+        assert self.error is None, f"ERROR: archive {self.path} failed: {self.error}"
+        return self.path
+
+    def __enter__(self) -> ExportArchive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self._write(*item)
+            except (OSError, zipfile.BadZipFile) as err:
+                self.error = err
+
+    def _write(self, fname: str, arcname: str, metrics: dict) -> None:
+        sha = hashlib.sha256()
+        with open(fname, "rb") as src, self._zip.open(arcname, "w", force_zip64=True) as dst:
+            while chunk := src.read(ARCHIVE_CHUNK):
+                sha.update(chunk)
+                dst.write(chunk)
+        entry = {"size": os.path.getsize(fname), "sha256": sha.hexdigest()}
+        if metrics is not None:
+            entry["metrics"] = metrics
+        self.manifest[arcname] = entry
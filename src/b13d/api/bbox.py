@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+    Analytic axis aligned bounding boxes, tracked through Shape constructors and operations
+
+    A bounding box is (xmin, ymin, zmin, xmax, ymax, zmax), None when unknown.
+    Boxes are conservative: the shape always lies inside its box.
+"""
+
+from __future__ import annotations
+import functools
+import inspect
+from math import cos, radians, sin
+from typing import Callable, Optional
+
+BBox = Optional[tuple[float, float, float, float, float, float]]
+
+
+def bbox_points(pts: list[tuple[float, ...]], z: tuple[float, float] = None) -> BBox:
+    """ box around 2D or 3D points, z range overrides the points z """
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    zs = list(z) if z is not None else [p[2] for p in pts]
+    return (min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+
+
+def bbox_grow(bb: BBox, d: float) -> BBox:
+    if bb is None:
+        return None
+    return (bb[0] - d, bb[1] - d, bb[2] - d, bb[3] + d, bb[4] + d, bb[5] + d)
+
+
+def bbox_mv(bb: BBox, x: float, y: float, z: float) -> BBox:
+    if bb is None:
+        return None
+    return (bb[0] + x, bb[1] + y, bb[2] + z, bb[3] + x, bb[4] + y, bb[5] + z)
+
+
+def bbox_scale(bb: BBox, x: float, y: float, z: float) -> BBox:
+    if bb is None:
+        return None
+    lo = (bb[0] * x, bb[1] * y, bb[2] * z)
+    hi = (bb[3] * x, bb[4] * y, bb[5] * z)
+    return (*map(min, lo, hi), *map(max, lo, hi))
+
+
+def bbox_rotate(bb: BBox, axis: int, ang: float) -> BBox:
+    """ box around the 8 rotated corners, right handed rotation in degrees """
+    if bb is None:
+        return None
+    c, s = cos(radians(ang)), sin(radians(ang))
+    # the two coordinates rotated by a rotation around axis
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    corners = []
+    for x in (bb[0], bb[3]):
+        for y in (bb[1], bb[4]):
+            for z in (bb[2], bb[5]):
+                p = [x, y, z]
+                p[i], p[j] = p[i] * c - p[j] * s, p[i] * s + p[j] * c
+                corners.append(p)
+    return bbox_points(corners)
+
+
+def bbox_mirror(bb: BBox) -> BBox:
+    """ mirror across the XZ plane """
+    if bb is None:
+        return None
+    return (bb[0], -bb[4], bb[2], bb[3], -bb[1], bb[5])
+
+
+def bbox_union(a: BBox, b: BBox) -> BBox:
+    if a is None or b is None:
+        return None
+    return (*map(min, a[:3], b[:3]), *map(max, a[3:], b[3:]))
+
+
+def bbox_intersection(a: BBox, b: BBox) -> BBox:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    lo = tuple(map(max, a[:3], b[:3]))
+    hi = tuple(map(min, a[3:], b[3:]))
+    # disjoint boxes collapse to an empty box at the low corner
+    return (*lo, *map(max, lo, hi))
+
+
+def bbox_overlap(a: BBox, b: BBox) -> bool:
+    """ False only when both boxes are known and disjoint """
+    if a is None or b is None:
+        return True
+    return all(a[k] <= b[k + 3] and b[k] <= a[k + 3] for k in range(3))
+
+
+def bbox_size(bb: BBox) -> tuple[float, float, float]:
+    if bb is None:
+        return None
+    return (bb[3] - bb[0], bb[4] - bb[1], bb[5] - bb[2])
+
+
+def _shape_bbox(shape) -> BBox:
+    return None if shape is None else shape.bbox
+
+
+# Shape operations: rule(bbox before, *operation args) -> bbox after
+SHAPE_BBOX_RULES: dict[str, Callable[..., BBox]] = {
+    "mv": bbox_mv,
+    "scale": bbox_scale,
+    "rotate_x": lambda bb, ang: bbox_rotate(bb, 0, ang),
+    "rotate_y": lambda bb, ang: bbox_rotate(bb, 1, ang),
+    "rotate_z": lambda bb, ang: bbox_rotate(bb, 2, ang),
+    "mirror": lambda bb, *args, **kwargs: bbox_mirror(bb),
+    "dup": lambda bb: bb,
+    "join": lambda bb, joiner: bb if joiner is None else bbox_union(bb, joiner.bbox),
+    "cut": lambda bb, cutter: bb,
+    "intersection": lambda bb, other: bbox_intersection(bb, _shape_bbox(other)),
+    "hull": lambda bb: bb,
+    "decimate": bbox_grow,
+}
+
+
+def _rod_bbox(axis: int, l: float, rad: float) -> BBox:
+    lo = [-rad, -rad, -rad]
+    hi = [rad, rad, rad]
+    lo[axis], hi[axis] = -l / 2, l / 2
+    return (*lo, *hi)
+
+
+def regpoly_bbox_rules(circumradius: Callable[[float, int], float]) -> dict[str, Callable[..., BBox]]:
+    """
+    regpoly_extrusion rules of an implementation whose polygon of sides,
+    built for radius rad, has the circumradius circumradius(rad, sides)
+    """
+    return {
+        "regpoly_extrusion_x": lambda l, rad, sides: _rod_bbox(0, l, circumradius(rad, sides)),
+        "regpoly_extrusion_y": lambda l, rad, sides: _rod_bbox(1, l, circumradius(rad, sides)),
+        "regpoly_extrusion_z": lambda l, rad, sides: _rod_bbox(2, l, circumradius(rad, sides)),
+    }
+
+
+def _cone_bbox(axis: int, h: float, r1: float, r2: float) -> BBox:
+    rad = max(r1, r2)
+    lo = [-rad, -rad, -rad]
+    hi = [rad, rad, rad]
+    lo[axis], hi[axis] = min(0, h), max(0, h)
+    return (*lo, *hi)
+
+
+def _box_bbox(l: float, wth: float, ht: float, center: bool = True) -> BBox:
+    if center:
+        return (-l / 2, -wth / 2, -ht / 2, l / 2, wth / 2, ht / 2)
+    return (0, 0, 0, l, wth, ht)
+
+
+def _instances_bbox(shape, transforms: list[tuple[float, ...]]) -> BBox:
+    bb = None
+    for n, t in enumerate(transforms):
+        tb = bbox_mv(bbox_scale(shape.bbox, *t[3:]) if len(t) > 3 else shape.bbox, *t[:3])
+        if tb is None:
+            return None
+        bb = tb if n == 0 else bbox_union(bb, tb)
+    return bb
+
+
+# ShapeAPI constructors: rule(*constructor args) -> bbox of the new shape
+API_BBOX_RULES: dict[str, Callable[..., BBox]] = {
+    "sphere": lambda r: (-r, -r, -r, r, r, r),
+    "box": _box_bbox,
+    "cone_x": lambda h, r1, r2: _cone_bbox(0, h, r1, r2),
+    "cone_y": lambda h, r1, r2: _cone_bbox(1, h, r1, r2),
+    "cone_z": lambda h, r1, r2: _cone_bbox(2, h, r1, r2),
+    "cylinder_x": lambda l, rad: _rod_bbox(0, l, rad),
+    "cylinder_y": lambda l, rad: _rod_bbox(1, l, rad),
+    "cylinder_z": lambda l, rad: _rod_bbox(2, l, rad),
+    # polygons inscribed in the circle of radius rad, see regpoly_bbox_rules otherwise
+    **regpoly_bbox_rules(lambda rad, sides: rad),
+    "cylinder_rounded_x": lambda l, rad, domeRatio=1: _rod_bbox(0, l, rad),
+    "cylinder_rounded_y": lambda l, rad, domeRatio=1: _rod_bbox(1, l, rad),
+    "cylinder_rounded_z": lambda l, rad, domeRatio=1: _rod_bbox(2, l, rad),
+    "ellipsoid_sector": lambda rx, ry, rz: (-rx[0], -ry[0], -rz[0], rx[1], ry[1], rz[1]),
+    "torus": lambda r_major, r_minor: (
+        -r_major - r_minor, -r_major - r_minor, -r_minor,
+        r_major + r_minor, r_major + r_minor, r_minor,
+    ),
+    "polygon_extrusion": lambda path, ht: bbox_points(path, z=(min(0, ht), max(0, ht))),
+    "regpoly_sweep": lambda rad, path: bbox_grow(bbox_points(path), rad),
+    "instances": _instances_bbox,
+}
+
+
+def test_regpoly_bbox(self):
+    """Test regpoly boxes hold the polygons of solid2 and cadquery, so overlapping cuts are kept"""
+    from b13d.api.core import Implementation
+    for impl in (Implementation.SOLID2, Implementation.CADQUERY):
+        try:
+            api = impl.get_api()
+        except ImportError as err:
+            print(f"WARNING: Skipping regpoly bbox test of {impl} api: {err}")
+            continue
+        for sides in (3, 4, 6):
+            rod = api.regpoly_extrusion_z(10, 1, sides)
+            # thin box past rad, inside the polygon corner on +x
+            cutter = api.box(0.2, 0.2, 20).mv(1.2, 0, 0)
+            self.assertTrue(bbox_overlap(rod.bbox, cutter.bbox), f"{impl} {sides} sides")
+            before = rod.solid
+            self.assertIsNot(rod.cut(cutter).solid, before, f"{impl} {sides} sides")
+
+
+def track_shape_op(fn: Callable, rule: Callable[..., BBox]) -> Callable:
+    """ wrap a Shape operation so its result carries the box given by rule """
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        bb = rule(self.bbox, *args, **kwargs)
+        result = fn(self, *args, **kwargs)
+        if result is not None:
+            result.bbox = bb
+        return result
+
+    wrapper.bbox_tracked = True
+    return wrapper
+
+
+def track_disjoint_cut(fn: Callable) -> Callable:
+    """ wrap Shape.cut so cutting with a cutter that cannot overlap is a no-op """
+
+    @functools.wraps(fn)
+    def wrapper(self, cutter, *args, **kwargs):
+        if (
+            self.skip_disjoint_booleans
+            and cutter is not None
+            and not bbox_overlap(self.bbox, cutter.bbox)
+        ):
+            return self
+        return fn(self, cutter, *args, **kwargs)
+
+    wrapper.bbox_tracked = True
+    return wrapper
+
+
+def track_constructor(fn: Callable, rule: Callable[..., BBox]) -> Callable:
+    """ wrap a ShapeAPI constructor so the new shape carries the box given by rule """
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        result = fn(self, *args, **kwargs)
+        if result is not None:
+            bound = sig.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            result.bbox = rule(*list(bound.arguments.values())[1:])
+        return result
+
+    wrapper.bbox_tracked = True
+    return wrapper
@@ -6,6 +6,7 @@ import bmesh
 import copy
 from math import ceil, pi
 from mathutils import Vector
+import numpy as np
 import os
 from pathlib import Path
 import sys
@@ -44,7 +45,11 @@ def gen_box_points(x: float, y: float, z: float) -> list[tuple[float, float, flo
 class BlenderShapeAPI(ShapeAPI):
 
     def export(self, shape: BlenderShape, path: Union[str, Path],fmt=".stl") -> None:
-        assert fmt in [".stl",".glb"]
+        assert fmt in [".stl",".glb",".npz"]
+
+        if fmt == ".npz":
+            shape.save_mesh(path)
+            return
         
         # shape.repairMesh()
         
@@ -103,6 +108,9 @@ class BlenderShapeAPI(ShapeAPI):
     def sphere(self, r: float) -> BlenderShape:
         return BlenderBall(r, self)
 
+    def torus(self, r_major: float, r_minor: float) -> BlenderShape:
+        return BlenderTorus(r_major, r_minor, self)
+
     def box(self, l: float, wth: float, ht: float, center: bool = True) -> BlenderShape:
         if True:
             # bpy.ops operation are supposedly slower than bpy.data
@@ -111,7 +119,7 @@ class BlenderShapeAPI(ShapeAPI):
             retval = BlenderBoxData(l, wth, ht, self)
         if center:
             return retval
-        return retval.mv(-l / 2, -wth / 2, -ht / 2)
+        return retval.mv(l / 2, wth / 2, ht / 2)
 
     def cone_x(self, h: float, r1: float, r2: float) -> BlenderShape:
         return BlenderConeX(h, r1, r2, self).mv(h / 2, 0, 0)
@@ -196,11 +204,16 @@ class BlenderShapeAPI(ShapeAPI):
     def genImport(self, infile: str, extrude: float = None) -> BlenderShape:
         return BlenderImport(infile, extrude=extrude)
 
+    def mesh_shape(self, vertices, faces) -> BlenderShape:
+        return BlenderMesh(vertices, faces, self)
+
 class BlenderShape(Shape):
 
     # MAX_DIM = 10000 # for max and min dimensions
     REPAIR_MIN_REZ = 0.005
     REPAIR_LOOPS = 2
+    # blender booleans run through the scene, always perform them
+    skip_disjoint_booleans = False
 
     def __init__(self, api: BlenderShapeAPI):
         super().__init__(api)
@@ -238,6 +251,19 @@ class BlenderShape(Shape):
 
         return (min_x, max_x, min_y, max_y, min_z, max_z)
 
+    def to_mesh(self) -> tuple[np.ndarray, np.ndarray]:
+        """ world space triangles of the object, with its modifiers applied """
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        bm = bmesh.new()
+        bm.from_object(self.solid.evaluated_get(depsgraph), depsgraph)
+        bm.transform(self.solid.matrix_world)
+        bmesh.ops.triangulate(bm, faces=bm.faces[:])
+        bm.verts.index_update()
+        vertices = np.array([v.co[:] for v in bm.verts], dtype=np.float64).reshape(-1, 3)
+        faces = np.array([[v.index for v in f.verts] for f in bm.faces], dtype=np.int64).reshape(-1, 3)
+        bm.free()
+        return vertices, faces
+
     def cut(self, cutter: BlenderShape) -> BlenderShape:
         if cutter is None:
             return self
@@ -505,7 +531,7 @@ class BlenderShape(Shape):
         self.solid.select_set(True)
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.segments(dim)
 
 
 class BlenderBall(BlenderShape):
@@ -520,6 +546,23 @@ class BlenderBall(BlenderShape):
         self.solid = bpy.context.object
 
 
+class BlenderTorus(BlenderShape):
+    def __init__(
+        self,
+        r_major: float,
+        r_minor: float,
+        api: BlenderShapeAPI,
+    ):
+        super().__init__(api)
+        bpy.ops.mesh.primitive_torus_add(
+            major_radius=r_major,
+            minor_radius=r_minor,
+            major_segments=self._smoothing_segments(2 * pi * (r_major + r_minor)),
+            minor_segments=self._smoothing_segments(2 * pi * r_minor),
+        )
+        self.solid = bpy.context.object
+
+
 class BlenderBoxOps(BlenderShape):
     def __init__(
         self,
@@ -593,6 +636,22 @@ class BlenderBoxData(BlenderShape):
         box_object.data.use_fake_user = True
         self.solid = box_object
 
+class BlenderMesh(BlenderShape):
+    def __init__(
+        self,
+        vertices,
+        faces,
+        api: BlenderShapeAPI,
+    ):
+        """ Object of an indexed triangle mesh, as loaded by load_mesh """
+        super().__init__(api)
+        mesh = bpy.data.meshes.new("Mesh_mesh")
+        mesh.from_pydata(np.asarray(vertices)[:, :3].tolist(), [], np.asarray(faces).tolist())
+        mesh.update()
+        obj = bpy.data.objects.new("Mesh", mesh)
+        bpy.context.collection.objects.link(obj)
+        self.solid = obj
+
 class BlenderConeZ(BlenderShape):
     def __init__(
         self,
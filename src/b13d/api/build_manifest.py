@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+    Build manifest of the files exported in an output directory
+
+    Each file is recorded with a deterministic hash of what it was exported from
+    (mesh data and export arguments) when the implementation has meshes, and with
+    the hash of its content. Unchanged files are left untouched, keeping their mtime.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from typing import Callable
+
+import numpy as np
+
+BUILD_MANIFEST = "build_manifest.json"
+# bytes hashed at a time
+HASH_CHUNK = 1 << 20
+# parts may be exported from several threads into one directory
+_LOCK = threading.Lock()
+
+
+def file_sha256(fname: str) -> str:
+    """ sha256 of the content of a file """
+    sha = hashlib.sha256()
+    with open(fname, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def shapes_digest(shapes: list, **args) -> str:
+    """ hash of the meshes of shapes and the export args, None if a shape has no mesh """
+    sha = hashlib.sha256()
+    for shape in shapes:
+        mesh = shape.to_mesh()
+        if mesh is None:
+            return None
+        vertices, faces = mesh
+        sha.update(np.ascontiguousarray(vertices, dtype="<f8")[:, :3].tobytes())
+        sha.update(np.ascontiguousarray(faces, dtype="<u4").tobytes())
+    sha.update(json.dumps(args, sort_keys=True, default=str).encode())
+    return sha.hexdigest()
+
+
+def load_build_manifest(out_path: str) -> dict:
+    """ {file name: {"digest", "sha256", "size"}} of an output directory """
+    fname = os.path.join(out_path, BUILD_MANIFEST)
+    if not os.path.isfile(fname):
+        return {}
+    with open(fname, encoding="UTF8") as f:
+        return json.load(f)
+
+
+def save_build_manifest(out_path: str, manifest: dict) -> None:
+    with open(os.path.join(out_path, BUILD_MANIFEST), "w", encoding="UTF8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+
+def export_if_changed(
+    out_fname: str,
+    write: Callable[[str], None],
+    digest: str = None,
+    rewrite: bool = False,
+) -> bool:
+    """
+    Export a file with write(path) unless unchanged, returns True if it was written.
+    With a digest, an unchanged file is detected from the manifest without exporting.
+    Without, the export goes to a temporary file that only replaces different content.
+    rewrite always writes the file.
+    """
+    out_path, name = os.path.split(out_fname)
+    with _LOCK:
+        entry = load_build_manifest(out_path).get(name)
+    if (
+        not rewrite
+        and digest is not None
+        and entry is not None
+        and entry.get("digest") == digest
+        and os.path.isfile(out_fname)
+        and os.path.getsize(out_fname) == entry.get("size")
+    ):
+        print(f"# Unchanged: {out_fname}")
+        return False
+
+    written = True
+    if not rewrite and digest is None and os.path.isfile(out_fname):
+        base, fext = os.path.splitext(out_fname)
+        tmp_fname = f"{base}.tmp{fext}"
+        write(tmp_fname)
+        if file_sha256(tmp_fname) == file_sha256(out_fname):
+            os.remove(tmp_fname)
+            print(f"# Unchanged: {out_fname}")
+            written = False
+        else:
+            os.replace(tmp_fname, out_fname)
+    else:
+        write(out_fname)
+
+    entry = {
+        "digest": digest,
+        "sha256": file_sha256(out_fname),
+        "size": os.path.getsize(out_fname),
+    }
+    with _LOCK:
+        manifest = load_build_manifest(out_path)
+        manifest[name] = entry
+        save_build_manifest(out_path, manifest)
+    return written
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import os
 import sys
+import functools
 import importlib
-from math import inf
+from math import ceil, cos, inf, pi, sin
 from enum import Enum
 from pathlib import Path
 from abc import ABC, abstractmethod
@@ -11,8 +12,17 @@ from typing import Union
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
-from b13d.api.constants import DEFAULT_TEST_DIR
-from b13d.api.utils import getFontname2FilepathMap
+from b13d.api.bbox import (
+    API_BBOX_RULES,
+    SHAPE_BBOX_RULES,
+    BBox,
+    track_constructor,
+    track_disjoint_cut,
+    track_shape_op,
+)
+from b13d.api.constants import ColorEnum, DEFAULT_TEST_DIR
+from b13d.api.trace import TRACED_API_OPS, TRACED_SHAPE_OPS, trace_op
+from b13d.api.utils import file_ensure_extension, getFontname2FilepathMap, lineSplineXY
 
 # consider update to StrEnum for python 3.11 and above
 # https://tsak.dev/posts/python-enum/
@@ -26,7 +36,11 @@ class StringEnum(str, Enum):
         return list(self)
 
 
+# segment cap of any curve in a preview build
+PREVIEW_MAX_SEGMENTS = 12
+
 class Fidelity(StringEnum):
+    PREVIEW = "preview"
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
@@ -36,6 +50,8 @@ class Fidelity(StringEnum):
 
     def tolerance(self) -> float:
         match self:
+            case Fidelity.PREVIEW:
+                return 0.002
             case Fidelity.LOW:
                 return 0.001
             case Fidelity.MEDIUM:
@@ -45,6 +61,8 @@ class Fidelity(StringEnum):
 
     def smoothing_segments(self) -> float:
         match self:
+            case Fidelity.PREVIEW:
+                return 3
             case Fidelity.LOW:
                 return 6
             case Fidelity.MEDIUM:
@@ -52,6 +70,16 @@ class Fidelity(StringEnum):
             case Fidelity.HIGH:
                 return 17 # 18 causes weird chamber for blender, also too slow
 
+    def segments(self, dim: float, power: float = 0.5, scale: float = 1.0) -> int:
+        """ number of segments to approximate a curve of length dim """
+        segs = ceil(abs(dim) ** power * self.smoothing_segments() * scale)
+        if self == Fidelity.PREVIEW:
+            return min(segs, PREVIEW_MAX_SEGMENTS)
+        return segs
+
+    def is_preview(self) -> bool:
+        return self == Fidelity.PREVIEW
+
     def code(self) -> str:
         return str(self)[0].upper()
 
@@ -98,13 +126,21 @@ class Implementation(StringEnum):
         """Returns True if API supports hull"""
         return APIS_INFO[self]["hull"]
 
+    def has_mesh(self):
+        """Returns True if API shapes are triangle meshes, exported as multi part packages"""
+        return APIS_INFO[self]["mesh"]
+
+    def has_threads(self):
+        """Returns True if API shapes can be exported from another thread while building"""
+        return APIS_INFO[self]["threads"]
+
 APIS_INFO = {
-    Implementation.MOCK      : {"module": "b13d.api.mock", "class": "MockShapeAPI", "fillet": False, "hull" : True},
-    Implementation.CADQUERY  : {"module": "b13d.api.cq", "class": "CQShapeAPI", "fillet": True, "hull" : False},
-    Implementation.BLENDER   : {"module": "b13d.api.bpy", "class": "BlenderShapeAPI", "fillet": True, "hull" : False},
-    Implementation.TRIMESH   : {"module": "b13d.api.tm", "class": "TMShapeAPI", "fillet": False, "hull" : True},
-    Implementation.SOLID2    : {"module": "b13d.api.sp2", "class": "Sp2ShapeAPI", "fillet": False, "hull" : True},
-    Implementation.MANIFOLD  : {"module": "b13d.api.mf", "class": "MFShapeAPI", "fillet": False, "hull" : True},
+    Implementation.MOCK      : {"module": "b13d.api.mock", "class": "MockShapeAPI", "fillet": False, "hull" : True, "mesh" : True, "threads" : True},
+    Implementation.CADQUERY  : {"module": "b13d.api.cq", "class": "CQShapeAPI", "fillet": True, "hull" : False, "mesh" : False, "threads" : False},
+    Implementation.BLENDER   : {"module": "b13d.api.bpy", "class": "BlenderShapeAPI", "fillet": True, "hull" : False, "mesh" : False, "threads" : False},
+    Implementation.TRIMESH   : {"module": "b13d.api.tm", "class": "TMShapeAPI", "fillet": False, "hull" : True, "mesh" : True, "threads" : True},
+    Implementation.SOLID2    : {"module": "b13d.api.sp2", "class": "Sp2ShapeAPI", "fillet": False, "hull" : True, "mesh" : False, "threads" : True},
+    Implementation.MANIFOLD  : {"module": "b13d.api.mf", "class": "MFShapeAPI", "fillet": False, "hull" : True, "mesh" : True, "threads" : True},
 }
 
 def supported_apis() -> list:
@@ -147,6 +183,37 @@ def default_or_alternate(def_val, alt_val=None):
     return alt_val
     # return def_val if alt_val is None else al
 
+def trace_ops(cls, names: tuple[str, ...], cat: str) -> None:
+    """ wrap the operations of a class, implemented or inherited, for tracing """
+    for name in names:
+        fn = getattr(cls, name, None)
+        if fn is not None and not getattr(fn, "traced", False):
+            setattr(cls, name, trace_op(fn, cat))
+
+def preview_skip_fillet(fn):
+    """ wrap Shape.fillet so preview builds skip fillets """
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if self.api.fidelity.is_preview():
+            return self
+        return fn(self, *args, **kwargs)
+
+    wrapper.preview_tracked = True
+    return wrapper
+
+def preview_text_box(fn):
+    """ wrap ShapeAPI.text so preview builds replace text with a box of similar extent """
+
+    @functools.wraps(fn)
+    def wrapper(self, txt: str, fontSize: float, tck: float, *args, **kwargs):
+        if self.fidelity.is_preview():
+            return self.box(0.6 * fontSize * max(len(txt), 1), 0.7 * fontSize, tck).mv(0, 0, tck / 2)
+        return fn(self, txt, fontSize, tck, *args, **kwargs)
+
+    wrapper.preview_tracked = True
+    return wrapper
+
 DIRECTION_TO_TUPLE = {
     'X' : (1,0,0),
     'Y' : (0,1,0),
@@ -179,6 +246,11 @@ class Shape(ABC):
     color : tuple[int, int, int] = None
     name : str = None
     solid = None
+    # conservative axis aligned bounding box (xmin, ymin, zmin, xmax, ymax, zmax),
+    # tracked analytically through constructors and operations, None when unknown
+    bbox : BBox = None
+    # cutting with a cutter whose bbox does not overlap returns the shape unchanged
+    skip_disjoint_booleans : bool = True
 
     def __init__(self,
                  api: ShapeAPI,
@@ -188,6 +260,21 @@ class Shape(ABC):
         self.solid = solid
         self.color = color
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # implementations only update the solid, wrap their operations to update the bbox
+        for name, rule in SHAPE_BBOX_RULES.items():
+            fn = cls.__dict__.get(name)
+            if fn is not None and not getattr(fn, "bbox_tracked", False):
+                fn = track_shape_op(fn, rule)
+                if name == "cut":
+                    fn = track_disjoint_cut(fn)
+                setattr(cls, name, fn)
+        fillet = cls.__dict__.get("fillet")
+        if fillet is not None and not getattr(fillet, "preview_tracked", False):
+            cls.fillet = preview_skip_fillet(fillet)
+        trace_ops(cls, TRACED_SHAPE_OPS, "shape")
+
     @abstractmethod
     def cut(self, cutter: Shape) -> Shape: ...
 
@@ -202,6 +289,47 @@ class Shape(ABC):
         print(f"Warning! Fillet not implemented yet for {self.api.implementation} api!")
         return self
 
+    def decimate(self, tolerance: float) -> Shape:
+        """ simplify the mesh, moving no surface by more than tolerance """
+        print(f"Warning! Decimation not implemented yet for {self.api.implementation} api!")
+        return self
+
+    def num_tri(self) -> int:
+        """ triangle count of the tessellated shape, None if unknown """
+        return None
+
+    def mesh_stats(self) -> tuple[int, float]:
+        """ (triangle count, surface area) of the tessellated shape, None if unknown """
+        return None
+
+    def metrics(self, hull: bool = False) -> dict:
+        """
+        volume, bounding_box_x/y/z, triangle_count and, if hull, convex_hull_volume
+        of the shape as exported, None if the implementation cannot compute them in memory
+        """
+        return None
+
+    def to_mesh(self) -> tuple:
+        """ (vertices, faces) arrays of the tessellated shape, None if unknown """
+        return None
+
+    def save_mesh(self, path: Union[str, Path], quantize: bool = False) -> None:
+        """ save the tessellated shape and its metadata as a compressed .npz mesh """
+        from b13d.api.mesh import save_mesh_npz
+        mesh = self.to_mesh()
+        assert mesh is not None, f"{self.api.implementation} api shapes have no triangle mesh"
+        rpt = self.metrics()
+        color = self.color.value if isinstance(self.color, Enum) else self.color
+        meta = {
+            "name": self.name,
+            "color": None if color is None else list(color),
+            "fidelity": str(self.api.fidelity),
+            "implementation": str(self.api.implementation),
+            "bbox": None if self.bbox is None else list(self.bbox),
+            "volume": None if rpt is None else rpt["volume"],
+        }
+        save_mesh_npz(file_ensure_extension(path, ".npz"), *mesh, quantize=quantize, meta=meta)
+
     def half(self, plane: tuple[bool, bool, bool] = (False, True, False)) -> Shape:
         halfCutter = (
             self.api
@@ -305,11 +433,111 @@ class Shape(ABC):
         return self.mv(*operand)
 
 
+class Shape2D(ABC):
+    """
+    Planar profile on the XY plane.
+    Profiles are combined with 2D booleans and offsets, then extruded once into a Shape.
+    """
+
+    api = None
+
+    def __init__(self, api: ShapeAPI):
+        self.api: ShapeAPI = api
+
+    @classmethod
+    def segments(cls, api: ShapeAPI, dim: float) -> int:
+        return api.segments(dim)
+
+    @classmethod
+    @abstractmethod
+    def polygon(cls, api: ShapeAPI, path: list[tuple[float, float]]) -> Shape2D: ...
+
+    @classmethod
+    @abstractmethod
+    def circle(cls, api: ShapeAPI, rad: float) -> Shape2D: ...
+
+    @classmethod
+    def rect(cls, api: ShapeAPI, l: float, wth: float) -> Shape2D:
+        return cls.polygon(
+            api, [(-l / 2, -wth / 2), (l / 2, -wth / 2), (l / 2, wth / 2), (-l / 2, wth / 2)]
+        )
+
+    @abstractmethod
+    def cut(self, cutter: Shape2D) -> Shape2D: ...
+
+    @abstractmethod
+    def dup(self) -> Shape2D: ...
+
+    @abstractmethod
+    def join(self, joiner: Shape2D) -> Shape2D: ...
+
+    @abstractmethod
+    def intersection(self, intersector: Shape2D) -> Shape2D: ...
+
+    @abstractmethod
+    def offset(self, delta: float) -> Shape2D:
+        """ grow (or shrink if negative) the outline by delta, with rounded corners """
+        ...
+
+    @abstractmethod
+    def mv(self, x: float, y: float) -> Shape2D: ...
+
+    @abstractmethod
+    def rotate(self, ang: float) -> Shape2D:
+        """ rotate around the origin, in degrees """
+        ...
+
+    @abstractmethod
+    def scale(self, x: float, y: float) -> Shape2D: ...
+
+    @abstractmethod
+    def extrude(self, ht: float) -> Shape:
+        """ extrude along Z from 0 to ht, below the XY plane if ht is negative """
+        ...
+
+    def __add__(self, operand) -> Shape2D:
+        """ Join using + """
+        if operand is None:
+            return self
+        assert isinstance(operand, Shape2D)
+        return self.join(operand)
+
+    def __sub__(self, operand) -> Shape2D:
+        """ cut using - """
+        if operand is None:
+            return self
+        assert isinstance(operand, Shape2D)
+        return self.cut(operand)
+
+    def __and__(self, operand) -> Shape2D:
+        """ intersect using & """
+        if operand is None:
+            return self
+        assert isinstance(operand, Shape2D)
+        return self.intersection(operand)
+
+    def __mul__(self, operand: tuple[float, float] = (1, 1)) -> Shape2D:
+        """ scale using * """
+        if operand is None:
+            return self
+        return self.scale(*operand)
+
+    def __lshift__(self, operand: tuple[float, float] = (0, 0)) -> Shape2D:
+        """ move using << """
+        if operand is None:
+            return self
+        return self.mv(*operand)
+
+
 class ShapeAPI(ABC):
     """ Prototype for Implementation API """
 
     implementation = None
     fidelity = None
+    # multiplies the segment counts of the fidelity, set from a triangle budget share
+    segment_scale : float = 1.0
+    # constructor bbox rules of this implementation, overriding API_BBOX_RULES
+    bbox_rules : dict = {}
     font2path = getFontname2FilepathMap()
 
     def __init__(
@@ -320,6 +548,22 @@ class ShapeAPI(ABC):
         self.implementation = implementation
         self.fidelity = fidelity
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # give the shapes built by the primitive constructors their analytic bbox
+        for name, rule in (API_BBOX_RULES | cls.bbox_rules).items():
+            fn = getattr(cls, name, None)
+            if fn is not None and not getattr(fn, "bbox_tracked", False):
+                setattr(cls, name, track_constructor(fn, rule))
+        text = getattr(cls, "text", None)
+        if text is not None and not getattr(text, "preview_tracked", False):
+            cls.text = preview_text_box(text)
+        trace_ops(cls, TRACED_API_OPS, "api")
+
+    def segments(self, dim: float, power: float = 0.5) -> int:
+        """ number of segments to approximate a curve of length dim """
+        return self.fidelity.segments(dim, power, self.segment_scale)
+
     def getFontPath(self, fontName: str) -> str:
         """
             given fontName return path to font file.
@@ -354,6 +598,93 @@ class ShapeAPI(ABC):
             joined = s if joined is None else joined.join(s)
         self.export_stl(shape=joined, path=path)
 
+    def export_levels(
+        self,
+        shape: Shape,
+        path: Union[str, Path],
+        fidelities: list[Fidelity],
+        fmt: str = ".stl",
+    ) -> list[str]:
+        """
+        Export one file per fidelity level, named <path>_<fidelity><fmt>.
+        Mesh implementations tessellate when building, so only their own level is exported.
+        """
+        if fidelities != [self.fidelity]:
+            print(f"Warning! {self.implementation} api can only export its build fidelity {self.fidelity}")
+        out_fname = f"{path}_{self.fidelity}{fmt}"
+        self.export(shape, out_fname, fmt=fmt)
+        return [out_fname]
+
+    def export_3mf(self, shapes: list[Shape], path: Union[str, Path]) -> None:
+        """ export shapes as the named and colored objects of one 3MF package """
+        from b13d.api.threemf import write_3mf
+        write_3mf(file_ensure_extension(path, ".3mf"), self._mesh_parts(shapes))
+
+    def mesh_shape(self, vertices, faces) -> Shape:
+        """ shape of an indexed triangle mesh, None if the implementation has no meshes """
+        print(f"Warning! Mesh shapes not implemented yet for {self.implementation} api!")
+        return None
+
+    def load_mesh(self, path: Union[str, Path]) -> Shape:
+        """ load a shape saved by Shape.save_mesh """
+        from b13d.api.mesh import load_mesh_npz
+        vertices, faces, meta = load_mesh_npz(file_ensure_extension(path, ".npz"))
+        shape = self.mesh_shape(vertices, faces)
+        if shape is not None:
+            shape.name = meta.get("name")
+            if meta.get("color") is not None:
+                rgb = tuple(meta["color"])
+                shape.color = next((c for c in ColorEnum if c.value == rgb), rgb)
+            if meta.get("bbox") is not None:
+                shape.bbox = tuple(meta["bbox"])
+        return shape
+
+    def _mesh_parts(self, shapes: list[Shape]) -> list[tuple]:
+        """ (name, vertices, faces, rgb color) of each shape, for multi part exports """
+        parts = []
+        for s in shapes:
+            mesh = s.to_mesh()
+            assert mesh is not None, f"{self.implementation} api shapes have no triangle mesh"
+            color = s.color.value if isinstance(s.color, Enum) else s.color
+            parts.append((s.name, *mesh, None if color is None else tuple(color)))
+        return parts
+
+    def export_glb(
+        self,
+        shapes: list[Shape],
+        path: Union[str, Path],
+        parents: list[int] = None,
+    ) -> None:
+        """ export shapes as one GLB scene, parents gives the parent shape index of each shape """
+        from b13d.api.gltf import write_glb
+        write_glb(file_ensure_extension(path, ".glb"), self._mesh_parts(shapes), parents)
+
+    def _shape2d(self) -> type[Shape2D]:
+        """ Shape2D class of this api, shapely based unless overridden """
+        from b13d.api.shape2d import ShapelyShape2D
+        return ShapelyShape2D
+
+    def polygon2d(self, path: list[tuple[float, float]]) -> Shape2D:
+        """ Generate a 2D polygon profile """
+        return self._shape2d().polygon(self, path)
+
+    def circle2d(self, rad: float) -> Shape2D:
+        """ Generate a 2D circle profile centered on the origin """
+        return self._shape2d().circle(self, rad)
+
+    def rect2d(self, l: float, wth: float) -> Shape2D:
+        """ Generate a 2D rectangle profile centered on the origin """
+        return self._shape2d().rect(self, l, wth)
+
+    def spline2d(
+        self,
+        start: tuple[float, float],
+        path: list[Union[tuple[float, float], list[tuple[float, float, float, float]]]],
+    ) -> Shape2D:
+        """ Generate a 2D profile from a mix of lines and splines, as in spline_extrusion """
+        cls = self._shape2d()
+        return cls.polygon(self, lineSplineXY(start, path, lambda dim: cls.segments(self, dim)))
+
     @abstractmethod
     def sphere(self, r: float) -> Shape: ...
 
@@ -457,6 +788,10 @@ class ShapeAPI(ABC):
 
         return mask
 
+    def capsule(self, l: float, rad: float, direction: Direction = Direction.Z) -> Shape:
+        """ Generate a cylinder of total length l with hemispherical ends """
+        return self.cylinder(l, rad, direction=direction, dome_ratio=1)
+
     def cylinder_rounded_x(self, l: float, rad: float, domeRatio: float = 1) -> Shape:
         return self.cylinder_rounded_z(l, rad, domeRatio).rotate_y(90)
 
@@ -509,16 +844,87 @@ class ShapeAPI(ABC):
         font: str,
     ): ...
 
-    def sphere_quadrant(self, rad: float, pickTop: bool, pickFront: bool):
+    def ellipsoid_sector(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+    ) -> Shape:
+        """
+        Generate an ellipsoid sector centered on the origin.
+        Each axis radius is given as (negative side, positive side),
+        a zero radius drops that half of the ellipsoid.
+        Default implementation joins scaled sphere cuts,
+        mesh based implementations generate the sector directly.
+        """
         maxDim = Shape.MAX_DIM
-        ball = self.sphere(rad)
-        topCut = self.box(maxDim, maxDim, maxDim).mv(
-            0, 0, -maxDim / 2 if pickTop else maxDim / 2
-        )
-        frontCut = self.box(maxDim, maxDim, maxDim).mv(
-            maxDim / 2 if pickFront else -maxDim / 2, 0, 0
+        joinTol = self.tolerance()
+        rmax = max(*rx, *ry, *rz)
+
+        def pieces(r: tuple[float, float]) -> list[tuple[float, int]]:
+            """ (radius, side) pieces along an axis, side 0 keeps both halves """
+            if r[0] == r[1]:
+                return [(r[1], 0)]
+            return [(rs, side) for rs, side in ((r[0], -1), (r[1], 1)) if rs > 0]
+
+        xps, yps, zps = pieces(rx), pieces(ry), pieces(rz)
+        overlap = (len(xps) > 1, len(yps) > 1, len(zps) > 1)
+
+        sector = None
+        for xr, xs in xps:
+            for yr, ys in yps:
+                for zr, zs in zps:
+                    piece = self.sphere(rmax)
+                    sides = (xs, ys, zs)
+                    for axis, side in enumerate(sides):
+                        if side != 0:
+                            offset = [0, 0, 0]
+                            offset[axis] = -side * maxDim / 2
+                            piece = piece.cut(self.box(maxDim, maxDim, maxDim).mv(*offset))
+                    piece = piece.scale(xr / rmax, yr / rmax, zr / rmax)
+                    # overlap pieces a little so they join into one solid
+                    piece = piece.mv(
+                        *[-side * joinTol / 2 if ovl else 0 for side, ovl in zip(sides, overlap)]
+                    )
+                    sector = piece if sector is None else sector.join(piece)
+        return sector
+
+    def torus(self, r_major: float, r_minor: float) -> Shape:
+        """
+        Generate a torus around the Z axis, centered on the origin.
+        Default implementation sweeps a circle along a polygonal ring.
+        """
+        segs = self.segments(2 * pi * r_major)
+        path = [
+            (r_major * cos(2 * pi * i / segs), r_major * sin(2 * pi * i / segs), 0)
+            for i in range(segs + 1)
+        ]
+        return self.regpoly_sweep(r_minor, path)
+
+    def instances(self, shape: Shape, transforms: list[tuple[float, ...]]) -> Shape:
+        """
+        Place copies of shape, one per transform, and return them as a single shape.
+        A transform is an (x, y, z) offset, optionally followed by an (sx, sy, sz)
+        scale that is applied about the origin before the offset.
+        The copies must not overlap each other, mesh based implementations
+        combine them without a boolean.
+        Default implementation joins transformed duplicates.
+        """
+        placed = None
+        for t in transforms:
+            inst = shape.dup()
+            if len(t) > 3:
+                inst = inst.scale(*t[3:])
+            inst = inst.mv(*t[:3])
+            placed = inst if placed is None else placed.join(inst)
+        return placed
+
+    def sphere_quadrant(self, rad: float, pickTop: bool, pickFront: bool):
+        return self.ellipsoid_sector(
+            rx=(rad, 0) if pickFront else (0, rad),
+            ry=(rad, rad),
+            rz=(0, rad) if pickTop else (rad, 0),
         )
-        return ball.cut(topCut).cut(frontCut)
 
     def cylinder_half(self, rad: float, pickFront: bool, tck: float):
         maxDim = Shape.MAX_DIM
@@ -550,6 +956,7 @@ class ShapeAPI(ABC):
 
         box = self.box(10, 20, 30)
         self.export_stl(box, expDir / f"{implCode}-box")
+        assert box.dup().mv(5, 0, 0).bbox == (0, -10, -15, 10, 10, 15)
 
         xRod = self.cylinder_x(30, 5)
         self.export_stl(xRod, expDir / f"{implCode}-xrod")
@@ -590,6 +997,22 @@ class ShapeAPI(ABC):
         zRndRod = self.cylinder_rounded_z(30, 5, 1 / 2)
         self.export_stl(zRndRod, expDir / f"{implCode}-zrndrod")
 
+        capsule = self.capsule(20, 4, direction=Direction.X)
+        self.export_stl(capsule, expDir / f"{implCode}-capsule")
+
+        torus = self.torus(15, 3)
+        self.export_stl(torus, expDir / f"{implCode}-torus")
+
+        prof = self.rect2d(20, 10) + self.circle2d(5).mv(10, 0)
+        prof -= self.circle2d(2).mv(-5, 0)
+        prof = prof.offset(1)
+        self.export_stl(prof.extrude(5), expDir / f"{implCode}-profile")
+
+        studs = self.instances(
+            self.cylinder_z(2, 1), [(x, 0, 0, 1, 1, 1 + x / 10) for x in range(0, 20, 4)]
+        )
+        self.export_stl(studs, expDir / f"{implCode}-instances")
+
         zPolyExt = self.polygon_extrusion([(0, 0), (10, 0), (0, 10)], 5)
         self.export_stl(zPolyExt, expDir / f"{implCode}-zpolyext")
 
@@ -602,6 +1025,9 @@ class ShapeAPI(ABC):
         qBall = self.sphere_quadrant(10, True, True)
         self.export_stl(qBall, expDir / f"{implCode}-qball")
 
+        eSect = self.ellipsoid_sector((20, 10), (5, 5), (3, 8))
+        self.export_stl(eSect, expDir / f"{implCode}-esect")
+
         hDisc = self.cylinder_half(10, True, 2)
         self.export_stl(hDisc, expDir / f"{implCode}-hdisc")
 
@@ -803,3 +1229,41 @@ class ShapeAPI(ABC):
             jout = box + xrod
             jout.hull()
             self.export_stl( jout, expDir / f"{implCode}-hull")
+
+        # test mesh save and load
+        if joined.to_mesh() is not None:
+            joined.set_name(f"{implCode}-all")
+            joined.save_mesh(expDir / f"{implCode}-all", quantize=True)
+            loaded = self.load_mesh(expDir / f"{implCode}-all")
+            self.export_stl( loaded, expDir / f"{implCode}-all-npz")
+            assert loaded.name == joined.name
+            assert loaded.bbox == joined.bbox
+            # quantizing may collapse a few sliver triangles
+            tris = len(joined.to_mesh()[1])
+            assert abs(len(loaded.to_mesh()[1]) - tris) <= 1e-3 * tris
+            before, after = joined.metrics(), loaded.metrics()
+            if before is not None:
+                # quantized to 1/65535 of the extent
+                assert abs(after["volume"] - before["volume"]) < 1e-3 * before["volume"]
+                for k in ("bounding_box_x", "bounding_box_y", "bounding_box_z"):
+                    assert abs(after[k] - before[k]) < 1e-3 * before[k]
+        else:
+            joined.set_name(f"{implCode}-all")
+            self.export(joined, expDir / f"{implCode}-all.npz", fmt=".npz")
+            assert self.load_mesh(expDir / f"{implCode}-all").name == joined.name
+
+        # test translated copies share one mesh in multi part exports
+        if joined.to_mesh() is not None:
+            import json, struct, zipfile
+            copies = [self.sphere(5), self.sphere(5).mv(13.37, -7.1, 2.9)]
+            self.export_3mf(copies, expDir / f"{implCode}-copies")
+            with zipfile.ZipFile(expDir / f"{implCode}-copies.3mf") as zf:
+                model = zf.read("3D/3dmodel.model").decode()
+            assert model.count("<object ") == 1 and model.count("<item ") == 2, \
+                f"{implCode}: translated copies not shared in 3MF"
+            self.export_glb(copies, expDir / f"{implCode}-copies")
+            with open(expDir / f"{implCode}-copies.glb", "rb") as f:
+                f.seek(12)
+                json_len, _ = struct.unpack("<II", f.read(8))
+                gltf = json.loads(f.read(json_len))
+            assert len(gltf["meshes"]) == 1, f"{implCode}: translated copies not shared in GLB"
@@ -11,7 +11,9 @@ from typing import Union
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
-from b13d.api.core import ShapeAPI, Shape, test_api
+from b13d.api.bbox import regpoly_bbox_rules
+from b13d.api.core import Fidelity, ShapeAPI, Shape, test_api
+from b13d.api.shape2d import ShapelyShape2D
 from b13d.api.utils import file_ensure_extension, lineSplineXY
 from b13d.conversion.svg2dxf import svg2dxf_wrapper
 
@@ -31,12 +33,28 @@ CQ_EXPORTERS = {
 
 class CQShapeAPI(ShapeAPI):
 
-    def export(self, shape: CQShape, path: Union[str, Path], fmt=".stl") -> None:
+    # CQPolyRod polygons have a circumscribed diameter of 4 * sin(pi / sides) * rad
+    bbox_rules = regpoly_bbox_rules(lambda rad, sides: 2 * math.sin(math.pi / sides) * rad)
+
+    def export(
+        self,
+        shape: CQShape,
+        path: Union[str, Path],
+        fmt=".stl",
+        tolerance: float = None,
+    ) -> None:
+        if tolerance is None:
+            tolerance = self.fidelity.tolerance()
+        if fmt == ".glb":
+            cq.Assembly(shape.solid).save(
+                file_ensure_extension(path, fmt), exportType="GLTF", tolerance=tolerance,
+            )
+            return
         cq.exporters.export(
             shape.solid,
             file_ensure_extension(path, fmt),
             CQ_EXPORTERS[fmt],
-            tolerance=self.fidelity.tolerance(),
+            tolerance=tolerance,
             opt={
                 "showAxes": False,
                 "projectionDir": (0, 0, 1),
@@ -48,6 +66,21 @@ class CQShapeAPI(ShapeAPI):
                 },
         )
 
+    def export_levels(
+        self,
+        shape: CQShape,
+        path: Union[str, Path],
+        fidelities: list[Fidelity],
+        fmt: str = ".stl",
+    ) -> list[str]:
+        # the BRep does not depend on fidelity, tessellate the same solid at each tolerance
+        out_fnames = []
+        for fidelity in fidelities:
+            out_fname = f"{path}_{fidelity}{fmt}"
+            self.export(shape, out_fname, fmt=fmt, tolerance=fidelity.tolerance())
+            out_fnames.append(out_fname)
+        return out_fnames
+
     def export_best(self, shape: CQShape, path: Union[str, Path]) -> None:
         self.export(shape=shape,path=path,fmt=".step")
 
@@ -74,9 +107,37 @@ class CQShapeAPI(ShapeAPI):
         # Export the assembly to a STEP file
         assembly.save(file_ensure_extension(path, ".step"))
 
+    def _shape2d(self) -> type[CQShape2D]:
+        return CQShape2D
+
     def sphere(self, rad: float) -> CQShape:
         return CQBall(rad, self)
 
+    def torus(self, r_major: float, r_minor: float) -> CQShape:
+        return CQTorus(r_major, r_minor, self)
+
+    def instances(self, shape: CQShape, transforms: list[tuple[float, ...]]) -> CQShape:
+        solid = shape.solid.val()
+        copies = []
+        for t in transforms:
+            if len(t) > 3 and tuple(t[3:]) != (1, 1, 1):
+                sx, sy, sz = t[3:]
+                mat = cq.Matrix(
+                    [
+                        [sx, 0, 0, t[0]],
+                        [0, sy, 0, t[1]],
+                        [0, 0, sz, t[2]],
+                        [0, 0, 0, 1],
+                    ]
+                )
+                copies.append(solid.transformGeometry(mat))
+            else:
+                # located copies share the same underlying BRep
+                copies.append(solid.moved(cq.Location(cq.Vector(*t[:3]))))
+        placed = copy.copy(shape)
+        placed.solid = cq.Workplane("XY").add(cq.Compound.makeCompound(copies))
+        return placed
+
     def box(self, ln: float, wth: float, ht: float, center: bool = True) -> CQShape:
         retval = CQBox(ln, wth, ht, self)
         if center:
@@ -110,6 +171,9 @@ class CQShapeAPI(ShapeAPI):
     def cylinder_z(self, l: float, rad: float) -> CQShape:
         return CQRod(l, rad, "XY", self)
 
+    def cylinder_rounded_z(self, l: float, rad: float, domeRatio: float = 1) -> CQShape:
+        return CQRndRodZ(l, rad, domeRatio, self)
+
     def polygon_extrusion(self, path: list[tuple[float, float]], ht: float) -> CQShape:
         return CQPolyExtrusionZ(path, ht, self)
 
@@ -146,6 +210,19 @@ class CQShape(Shape):
         super().__init__(api)
         self.solid: cq.Workplane = None
 
+    def metrics(self, hull: bool = False) -> dict:
+        # the triangle count and hull depend on the export tessellation, not reported
+        if hull:
+            return None
+        solid = self.solid.val()
+        bb = solid.BoundingBox()
+        return {
+            "volume": solid.Volume(),
+            "bounding_box_x": bb.xlen,
+            "bounding_box_y": bb.ylen,
+            "bounding_box_z": bb.zlen,
+        }
+
     def cut(self, cutter: CQShape) -> CQShape:
         self.solid = self.solid.cut(cutter.solid)
         return self
@@ -180,7 +257,7 @@ class CQShape(Shape):
 
     def _smoothing_segments(self, dim: float) -> int:
         # Since CadQuery isusing Spline to connect pts for curves so use less segments
-        return math.ceil(abs(dim) ** 0.25 * self.api.fidelity.smoothing_segments())
+        return self.api.segments(dim, power=0.25)
 
     def mirror(self) -> CQShape:
         mirror = self.solid.mirror("XZ")
@@ -233,6 +310,21 @@ class CQShape(Shape):
         return self
 
 
+class CQShape2D(ShapelyShape2D):
+    def extrude(self, ht: float) -> CQShape:
+        # planar booleans are done by shapely, the sketch only rebuilds the final faces
+        sketch = cq.Sketch()
+        for poly in self.polygons():
+            sketch = sketch.polygon(list(poly.exterior.coords))
+            for hole in poly.interiors:
+                sketch = sketch.polygon(list(hole.coords), mode="s")
+        shape = CQShape(self.api)
+        shape.solid = cq.Workplane("XY").placeSketch(sketch).extrude(abs(ht))
+        if ht < 0:
+            shape.mv(0, 0, ht)
+        return shape
+
+
 class CQBall(CQShape):
     def __init__(self, rad: float, api: CQShapeAPI):
         super().__init__(api)
@@ -240,6 +332,12 @@ class CQBall(CQShape):
         self.solid = cq.Workplane("XY").sphere(rad)
 
 
+class CQTorus(CQShape):
+    def __init__(self, r_major: float, r_minor: float, api: CQShapeAPI):
+        super().__init__(api)
+        self.solid = cq.Workplane("XY").add(cq.Solid.makeTorus(r_major, r_minor))
+
+
 class CQCone(CQShape):
     def __init__(
         self,
@@ -280,6 +378,27 @@ class CQRod(CQShape):
         self.solid = cq.Workplane(plane).cylinder(ln, rad)
 
 
+class CQRndRodZ(CQShape):
+    def __init__(self, ln: float, rad: float, domeRatio: float, api: CQShapeAPI):
+        super().__init__(api)
+        self.ln = ln
+        self.rad = rad
+        domeHt = rad * domeRatio
+        stem = max(ln - 2 * domeHt, 0)
+        # half profile on the XZ plane (local y is Z), revolved around Z
+        profile = (
+            cq.Workplane("XZ")
+            .moveTo(0, stem / 2)
+            .ellipseArc(rad, domeHt, 0, 90, startAtCurrent=False)
+            .lineTo(0, -stem / 2 - domeHt)
+            .moveTo(0, -stem / 2)
+            .ellipseArc(rad, domeHt, 270, 360, startAtCurrent=False)
+        )
+        if stem > 0:
+            profile = profile.lineTo(rad, stem / 2)
+        self.solid = profile.wire().revolve(360, (0, 0, 0), (0, 1, 0))
+
+
 class CQBox(CQShape):
     def __init__(self, ln: float, wth: float, ht: float, api: CQShapeAPI):
         super().__init__(api)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+"""
+    Binary glTF (GLB) scene writer for mesh based implementations
+
+    All meshes share one binary buffer. Positions are quantized to unsigned shorts
+    (KHR_mesh_quantization), dequantized by the scale and translation of the mesh node.
+    Meshes only differing by a translation are stored once.
+"""
+
+from __future__ import annotations
+import json
+import struct
+from typing import Optional
+
+import numpy as np
+
+from b13d.api.mesh import MeshPart, mesh_key
+
+GLB_MAGIC = 0x46546C67
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+# accessor component types
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+# buffer view targets
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+QUANTIZE_MAX = 65535
+
+
+def _pad4(data: bytes, fill: bytes = b"\0") -> bytes:
+    return data + fill * (-len(data) % 4)
+
+
+def write_glb(
+    path: str,
+    parts: list[MeshPart],
+    parents: Optional[list[int]] = None,
+    quantize: bool = True,
+) -> None:
+    """
+    Write (name, vertices, faces, rgb color or None) parts as one GLB scene.
+    parents gives the index of the parent part of each part, -1 for scene roots.
+    """
+    if parents is None:
+        parents = [-1] * len(parts)
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "b13d"},
+        "scene": 0,
+        "scenes": [{"nodes": []}],
+        "nodes": [],
+        "meshes": [],
+        "materials": [],
+        "accessors": [],
+        "bufferViews": [],
+        "buffers": [],
+    }
+    if quantize:
+        gltf["extensionsUsed"] = ["KHR_mesh_quantization"]
+        gltf["extensionsRequired"] = ["KHR_mesh_quantization"]
+
+    blobs: list[bytes] = []
+    offset = 0
+
+    def add_view(data: bytes, target: int, **kwargs) -> int:
+        nonlocal offset
+        gltf["bufferViews"].append(
+            {"buffer": 0, "byteOffset": offset, "byteLength": len(data), "target": target, **kwargs}
+        )
+        blobs.append(_pad4(data))
+        offset += len(blobs[-1])
+        return len(gltf["bufferViews"]) - 1
+
+    def add_accessor(view: int, ctype: int, count: int, atype: str, **kwargs) -> int:
+        gltf["accessors"].append(
+            {"bufferView": view, "componentType": ctype, "count": count, "type": atype, **kwargs}
+        )
+        return len(gltf["accessors"]) - 1
+
+    materials: dict[tuple, int] = {}
+    meshes: dict[str, tuple[int, np.ndarray]] = {}
+    part_nodes: list[int] = []
+    for name, vertices, faces, color in parts:
+        vertices = np.asarray(vertices, dtype=float)[:, :3]
+        faces = np.asarray(faces)
+        lo = vertices.min(axis=0) if len(vertices) > 0 else np.zeros(3)
+        local = vertices - lo
+        key = mesh_key(local, faces) + str(color)
+
+        if key not in meshes:
+            if color is not None and color not in materials:
+                materials[color] = len(gltf["materials"])
+                gltf["materials"].append(
+                    {"pbrMetallicRoughness": {"baseColorFactor": [c / 255 for c in color] + [1.0]}}
+                )
+
+            extent = local.max(axis=0) if len(local) > 0 else np.zeros(3)
+            if quantize:
+                scale = np.where(extent > 0, extent / QUANTIZE_MAX, 1.0)
+                positions = np.round(local / scale).astype("<u2")
+                # vertex attribute elements are aligned to 4 bytes
+                padded = np.zeros((len(positions), 4), dtype="<u2")
+                padded[:, :3] = positions
+                view = add_view(padded.tobytes(), ARRAY_BUFFER, byteStride=8)
+                pos_type = UNSIGNED_SHORT
+            else:
+                scale = np.ones(3)
+                positions = local.astype("<f4")
+                view = add_view(positions.tobytes(), ARRAY_BUFFER)
+                pos_type = FLOAT
+            pos = add_accessor(
+                view, pos_type, len(positions), "VEC3",
+                min=positions.min(axis=0).tolist(), max=positions.max(axis=0).tolist(),
+            )
+            # the largest index value is reserved
+            itype = "<u2" if len(vertices) < QUANTIZE_MAX else "<u4"
+            idx = add_accessor(
+                add_view(faces.astype(itype).tobytes(), ELEMENT_ARRAY_BUFFER),
+                UNSIGNED_SHORT if itype == "<u2" else UNSIGNED_INT, faces.size, "SCALAR",
+            )
+            primitive = {"attributes": {"POSITION": pos}, "indices": idx}
+            if color is not None:
+                primitive["material"] = materials[color]
+            gltf["meshes"].append({"name": name or "", "primitives": [primitive]})
+            meshes[key] = (len(gltf["meshes"]) - 1, scale)
+
+        # the part node groups its mesh node and the nodes of its sub parts
+        mesh, scale = meshes[key]
+        gltf["nodes"].append(
+            {"mesh": mesh, "translation": lo.tolist(), "scale": scale.tolist()}
+        )
+        gltf["nodes"].append({"name": name or "", "children": [len(gltf["nodes"]) - 1]})
+        part_nodes.append(len(gltf["nodes"]) - 1)
+
+    for node, parent in zip(part_nodes, parents):
+        if parent < 0:
+            gltf["scenes"][0]["nodes"].append(node)
+        else:
+            gltf["nodes"][part_nodes[parent]]["children"].append(node)
+
+    for k in ("materials", "accessors", "bufferViews", "meshes"):
+        if not gltf[k]:
+            del gltf[k]
+    gltf["buffers"].append({"byteLength": offset})
+
+    json_chunk = _pad4(json.dumps(gltf, separators=(",", ":")).encode(), b" ")
+    length = 12 + 8 + len(json_chunk) + 8 + offset
+    with open(path, "wb") as file:
+        file.write(struct.pack("<III", GLB_MAGIC, GLB_VERSION, length))
+        file.write(struct.pack("<II", len(json_chunk), CHUNK_JSON))
+        file.write(json_chunk)
+        file.write(struct.pack("<II", offset, CHUNK_BIN))
+        for blob in blobs:
+            file.write(blob)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+"""
+    Analytic mesh generation shared by the mesh based implementations
+"""
+
+import hashlib
+import json
+from math import ceil, cos, pi, sin
+from typing import Optional
+import numpy as np
+
+# (name, vertices, faces, rgb color or None) of one part of a multi part export
+MeshPart = tuple[str, np.ndarray, np.ndarray, Optional[tuple[int, int, int]]]
+
+
+# binary STL records, everything in STL is little endian
+STL_DTYPE = np.dtype(
+    [
+        ("normals", "<f4", (3)),
+        ("vertices", "<f4", (3, 3)),
+        ("attributes", "<u2"),
+    ]
+)
+STL_HEADER_DTYPE = np.dtype([("header", np.void, 80), ("face_count", "<u4")])
+# triangles packed per write, bounds the memory of the writer
+STL_CHUNK_FACES = 1 << 16
+# [mm] vertices closer than this are the same when identifying duplicate meshes
+MESH_KEY_TOLERANCE = 1e-4
+
+
+def triangle_normals(tris: np.ndarray) -> np.ndarray:
+    """ unit normals of (n, 3, 3) triangles, zero for degenerate triangles """
+    normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(lengths == 0, 1, lengths)
+
+
+def write_stl_binary(
+    path: str,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    chunk_faces: int = STL_CHUNK_FACES,
+) -> None:
+    """
+    Stream an indexed triangle mesh to a binary STL file,
+    packing and writing chunk_faces triangles at a time.
+    """
+    vertices = np.asarray(vertices)[:, :3]
+    faces = np.asarray(faces)
+    header = np.zeros(1, dtype=STL_HEADER_DTYPE)
+    header["face_count"] = len(faces)
+    packed = np.zeros(min(chunk_faces, len(faces)), dtype=STL_DTYPE)
+    with open(path, "wb") as file:
+        header.tofile(file)
+        for start in range(0, len(faces), chunk_faces):
+            tris = vertices[faces[start : start + chunk_faces]]
+            chunk = packed[: len(tris)]
+            chunk["vertices"] = tris
+            chunk["normals"] = triangle_normals(tris)
+            chunk.tofile(file)
+
+
+def mesh_key(vertices: np.ndarray, faces: np.ndarray, tolerance: float = MESH_KEY_TOLERANCE) -> str:
+    """
+    hash identifying a mesh, vertices are expected relative to their min corner
+    and snapped to tolerance, float32 meshes translated apart differ in the last bits
+    """
+    h = hashlib.sha1()
+    h.update(np.round(np.asarray(vertices) / tolerance).astype("<i8").tobytes())
+    h.update(np.asarray(faces).astype("<u4").tobytes())
+    return h.hexdigest()
+
+
+def save_mesh_npz(
+    path: str,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    quantize: bool = False,
+    meta: Optional[dict] = None,
+) -> None:
+    """
+    Save an indexed triangle mesh and its json metadata as a compressed .npz.
+    Quantized vertices are stored as unsigned shorts over the mesh bounding box.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)[:, :3]
+    faces = np.asarray(faces)
+    arrays = {"meta": np.array(json.dumps(meta or {}))}
+    # the smallest index type holding all vertex indices
+    arrays["faces"] = faces.astype("<u2" if len(vertices) <= 1 << 16 else "<u4")
+    if quantize and len(vertices) > 0:
+        lo = vertices.min(axis=0)
+        extent = vertices.max(axis=0) - lo
+        scale = np.where(extent > 0, extent / 65535, 1.0)
+        arrays["vertices"] = np.round((vertices - lo) / scale).astype("<u2")
+        arrays["offset"] = lo
+        arrays["scale"] = scale
+    else:
+        arrays["vertices"] = vertices.astype("<f4")
+    with open(path, "wb") as file:
+        np.savez_compressed(file, **arrays)
+
+
+def load_mesh_npz(path: str) -> tuple[np.ndarray, np.ndarray, dict]:
+    """ (vertices, faces, metadata) of a mesh saved by save_mesh_npz """
+    with np.load(path) as data:
+        vertices = data["vertices"].astype(np.float64)
+        if "scale" in data:
+            vertices = vertices * data["scale"] + data["offset"]
+        faces = data["faces"].astype(np.int64)
+        meta = json.loads(str(data["meta"]))
+    return vertices, faces, meta
+
+
+def ellipsoid_sector_scale(
+    verts: np.ndarray,
+    rx: tuple[float, float],
+    ry: tuple[float, float],
+    rz: tuple[float, float],
+) -> np.ndarray:
+    """ scale unit sphere vertices by the (negative side, positive side) radius of each axis """
+    radii = np.array([rx, ry, rz], dtype=float)
+    return np.where(verts > 0, verts * radii[:, 1], verts * radii[:, 0])
+
+
+def rounded_rod_profile(
+    l: float,
+    rad: float,
+    domeRatio: float,
+    segs: int,
+) -> list[tuple[float, float]]:
+    """
+    (radius, z) profile of a rod along Z with elliptic domes of height rad * domeRatio,
+    running from the top pole down to the bottom pole, to be revolved around Z.
+    """
+    stem = max(l - 2 * rad * domeRatio, 0)
+    qsegs = max(1, ceil(segs / 4))
+    top = [
+        (rad * sin(a), stem / 2 + rad * domeRatio * cos(a))
+        for a in (i * (pi / 2) / qsegs for i in range(qsegs + 1))
+    ]
+    bot = [(r, -z) for r, z in reversed(top)]
+    return top + (bot if stem > 0 else bot[1:])
+
+
+def _orient_fan(
+    verts: np.ndarray,
+    center: int,
+    arc: list[int],
+    normal: tuple[float, float, float],
+    closed: bool = False,
+) -> list[tuple[int, int, int]]:
+    """ triangle fan from center to arc, wound counter clockwise seen from normal """
+    ring = arc + arc[:1] if closed else arc
+    faces = [(center, a, b) for a, b in zip(ring[:-1], ring[1:])]
+    f0 = faces[len(faces) // 2]
+    n = np.cross(verts[f0[1]] - verts[f0[0]], verts[f0[2]] - verts[f0[0]])
+    if np.dot(n, normal) < 0:
+        faces = [(c, b, a) for c, a, b in faces]
+    return faces
+
+
+def ellipsoid_sector_mesh(
+    rx: tuple[float, float],
+    ry: tuple[float, float],
+    rz: tuple[float, float],
+    segs: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Closed triangle mesh of an ellipsoid sector centered on the origin.
+    Each axis radius is given as (negative side, positive side),
+    a zero radius drops that half of the ellipsoid and closes it with a flat cap.
+    Returns vertices and counter clockwise (outward facing) faces.
+    """
+    keep_x = (rx[0] > 0, rx[1] > 0)
+    keep_y = (ry[0] > 0, ry[1] > 0)
+    keep_z = (rz[0] > 0, rz[1] > 0)
+    assert any(keep_x) and any(keep_y) and any(keep_z), "ellipsoid sector is empty"
+
+    # azimuth quadrants (+x+y, -x+y, -x-y, +x-y) kept, they are always contiguous
+    quads = [
+        keep_x[1] and keep_y[1],
+        keep_x[0] and keep_y[1],
+        keep_x[0] and keep_y[0],
+        keep_x[1] and keep_y[0],
+    ]
+    nquads = sum(quads)
+    full_phi = nquads == 4
+    start = 0 if full_phi else next(i for i in range(4) if quads[i] and not quads[i - 1])
+
+    # segments per quarter turn, so the coordinate planes are grid lines
+    qsegs = max(1, ceil(segs / 4))
+    nphi = qsegs * nquads
+    phis = start * pi / 2 + np.arange(nphi + (0 if full_phi else 1)) * (pi / 2) / qsegs
+
+    theta0 = 0 if keep_z[1] else pi / 2
+    theta1 = pi if keep_z[0] else pi / 2
+    ntheta = qsegs * (keep_z[0] + keep_z[1])
+    thetas = np.linspace(theta0, theta1, ntheta + 1)
+
+    north = theta0 == 0
+    south = theta1 == pi
+    ring_thetas = thetas[(1 if north else 0) : (len(thetas) - 1 if south else len(thetas))]
+
+    npole = 0 if north else None
+    nrows = len(ring_thetas)
+    ncols = len(phis)
+    first = 1 if north else 0
+    rows = first + np.arange(nrows * ncols).reshape(nrows, ncols)
+    spole = first + nrows * ncols if south else None
+
+    tt, pp = np.meshgrid(ring_thetas, phis, indexing="ij")
+    ring_verts = np.stack(
+        [np.sin(tt) * np.cos(pp), np.sin(tt) * np.sin(pp), np.cos(tt)], axis=-1
+    ).reshape(-1, 3)
+    verts = np.vstack(
+        ([(0.0, 0.0, 1.0)] if north else [])
+        + [ring_verts]
+        + ([(0.0, 0.0, -1.0)] if south else [])
+    )
+
+    # curved surface, quads between rings and fans around the poles
+    a = np.arange(nphi)
+    b = (a + 1) % ncols
+    faces = []
+    if north:
+        faces.append(np.stack([np.full(nphi, npole), rows[0, a], rows[0, b]], axis=-1))
+    upper, lower = rows[:-1], rows[1:]
+    faces.append(np.stack([upper[:, a], lower[:, a], lower[:, b]], axis=-1).reshape(-1, 3))
+    faces.append(np.stack([upper[:, a], lower[:, b], upper[:, b]], axis=-1).reshape(-1, 3))
+    if south:
+        faces.append(np.stack([rows[-1, a], np.full(nphi, spole), rows[-1, b]], axis=-1))
+    faces = [tuple(f) for f in np.vstack(faces).tolist()]
+
+    # flat caps on the cut planes, fanned from the origin
+    if not full_phi or not all(keep_z):
+        origin = len(verts)
+        verts = np.vstack([verts, (0.0, 0.0, 0.0)])
+        if not full_phi:
+            for j, side in ((0, -1), (ncols - 1, 1)):
+                arc = ([npole] if north else []) + rows[:, j].tolist() + ([spole] if south else [])
+                p = phis[j]
+                normal = (-side * np.sin(p), side * np.cos(p), 0)
+                faces.extend(_orient_fan(verts, origin, arc, normal))
+        if not all(keep_z):
+            equator = (rows[-1] if north else rows[0]).tolist()
+            normal = (0, 0, -1 if north else 1)
+            faces.extend(_orient_fan(verts, origin, equator, normal, closed=full_phi))
+
+    return ellipsoid_sector_scale(verts, rx, ry, rz), np.array(faces, dtype=np.int64)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 import copy
 from math import pi, ceil
-from manifold3d import Manifold, CrossSection, FillRule
+from manifold3d import Manifold, Mesh, CrossSection, FillRule, JoinType
 import numpy as np
 import os
 from pathlib import Path
@@ -13,7 +13,8 @@ from svgpathtools import svg2paths, Arc
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
-from b13d.api.core import ShapeAPI, Shape, test_api, Direction, Implementation
+from b13d.api.core import ShapeAPI, Shape, Shape2D, test_api, Direction, Implementation
+from b13d.api.mesh import ellipsoid_sector_scale, rounded_rod_profile, write_stl_binary
 from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY, textToGlyphsPaths
 
 
@@ -25,84 +26,58 @@ from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY, textToGly
 class MFShapeAPI(ShapeAPI):
 
     def export_stl(self, shape: MFShape, path: Union[str, Path]) -> None:
-
-        def calculate_normals(vertices, faces):
-            # Vertices shape: (vn, 3), Faces shape: (fn, 3)
-
-            # Get the vertices for each face using the face indices
-            v1 = vertices[faces[:, 0]]
-            v2 = vertices[faces[:, 1]]
-            v3 = vertices[faces[:, 2]]
-
-            # Calculate two edge vectors for each triangle
-            edge1 = v2 - v1
-            edge2 = v3 - v1
-
-            # Compute the cross product (normal) of each triangle's edge vectors
-            normals = np.cross(edge1, edge2)
-
-            # Normalize the resulting normals
-            normal_magnitudes = np.linalg.norm(normals, axis=1).reshape(-1, 1)
-            normalized_normals = normals / np.where(
-                normal_magnitudes == 0, 1, normal_magnitudes
-            )  # Avoid divide by zero
-            return normalized_normals
-
-        def face_idxs_to_vertices(vertices, faces):
-            """
-            Translate face indices to face vertices.
-
-            Parameters:
-            - vertices: numpy array of shape (vn, 3), representing vertex coordinates.
-            - faces: numpy array of shape (fn, 3), representing indices of the vertices that form each triangular face.
-
-            Returns:
-            - face_vertices: numpy array of shape (fn, 3, 3) where each face is represented by its corresponding vertex coordinates.
-            """
-            # Use numpy advanced indexing to map face indices to actual vertex coordinates
-            face_vertices = vertices[faces]
-            return face_vertices
-
-        # define a numpy datatype for the data section of a binary STL file
-        # everything in STL is always Little Endian
-        # this works natively on Little Endian systems, but blows up on Big Endians
-        # so we always specify byteorder
-        stl_dtype = np.dtype(
-            [
-                ("normals", "<f4", (3)),
-                ("vertices", "<f4", (3, 3)),
-                ("attributes", "<u2"),
-            ]
-        )
-        # define a numpy datatype for the header of a binary STL file
-        stl_dtype_header = np.dtype([("header", np.void, 80), ("face_count", "<u4")])
-
         obj_mesh = shape.getImplSolid().to_mesh()
-        vertices = obj_mesh.vert_properties
-        face_tri_idxs = obj_mesh.tri_verts
-        face_normals = calculate_normals(vertices, face_tri_idxs)
-
-        header = np.zeros(1, dtype=stl_dtype_header)
-        header["face_count"] = len(face_tri_idxs)
-        export = header.tobytes()
-        packed = np.zeros(len(face_tri_idxs), dtype=stl_dtype)
-        packed["normals"] = face_normals
-        packed["vertices"] = face_idxs_to_vertices(vertices, face_tri_idxs)
-        export += packed.tobytes()
-
-        # Open a file in binary write mode and write the data to it
-        with open(file_ensure_extension(path, ".stl"), "wb") as file:
-            file.write(export)
+        write_stl_binary(
+            file_ensure_extension(path, ".stl"), obj_mesh.vert_properties, obj_mesh.tri_verts
+        )
 
     def export_best(self, shape: MFShape, path: Union[str, Path]) -> None:
         self.export_stl(shape, path)
 
+    def export_best_multishapes(
+        self,
+        shapes: list[Shape],
+        assembly_name: str,
+        path: Union[str, Path],
+    ) -> None:
+        self.export_3mf(shapes, path)
+
     def export(self, shape: MFShape, path: Union[str, Path],fmt=".stl") -> None:
+        if fmt == ".glb":
+            self.export_glb([shape], path)
+            return
+        if fmt == ".npz":
+            shape.save_mesh(path)
+            return
         self.export_stl(shape=shape,path=path)
 
+    def _shape2d(self) -> type[MFShape2D]:
+        return MFShape2D
+
     def sphere(self, r: float) -> MFShape:
         return MFBall(r, self)
 
+    def ellipsoid_sector(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+    ) -> MFShape:
+        return MFEllipsoidSector(rx, ry, rz, self)
+
+    def torus(self, r_major: float, r_minor: float) -> MFShape:
+        return MFTorus(r_major, r_minor, self)
+
+    def instances(self, shape: MFShape, transforms: list[tuple[float, ...]]) -> MFShape:
+        placed = shape.dup()
+        placed.solid = Manifold.compose(
+            [
+                shape.solid.scale(t[3:] if len(t) > 3 else (1, 1, 1)).translate(t[:3])
+                for t in transforms
+            ]
+        )
+        return placed
+
     def box(self, l: float, wth: float, ht: float, center: bool = True) -> MFShape:
         return MFBox(l, wth, ht, center, self)
 
@@ -133,6 +108,9 @@ class MFShapeAPI(ShapeAPI):
     def cylinder_z(self, l: float, rad: float) -> MFShape:
         return MFRodZ(l, rad, None, self)
 
+    def cylinder_rounded_z(self, l: float, rad: float, domeRatio: float = 1) -> MFShape:
+        return MFRndRodZ(l, rad, domeRatio, self)
+
     def polygon_extrusion(self, path: list[tuple[float, float]], ht: float) -> MFShape:
         return MFPolyExtrusionZ(path, ht, self)
 
@@ -172,6 +150,13 @@ class MFShapeAPI(ShapeAPI):
     def genImport(self, infile: str, extrude: float = None) -> MFShape:
         return MFImport(infile, extrude=extrude)
 
+    def mesh_shape(self, vertices, faces) -> MFShape:
+        mesh = Mesh(
+            vert_properties=np.asarray(vertices, dtype=np.float32),
+            tri_verts=np.asarray(faces, dtype=np.uint32),
+        )
+        return MFShape(self, Manifold(mesh))
+
 class MFShape(Shape):
 
     def getAPI(self) -> MFShapeAPI:
@@ -181,7 +166,7 @@ class MFShape(Shape):
         return self.solid
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.segments(dim)
 
     def cut(self, cutter: MFShape) -> MFShape:
         if cutter is None or cutter.solid is None:
@@ -190,11 +175,9 @@ class MFShape(Shape):
         return self
 
     def dup(self) -> MFShape:
-        duplicate = copy.copy(self)
-        duplicate.solid = Manifold.compose(
-            self.solid.decompose()
-        )  # TODO find better impl
-        return duplicate
+        # Manifold objects are immutable and every operation rebinds self.solid,
+        # so the duplicate can share the handle instead of copying the mesh
+        return copy.copy(self)
 
     def join(self, joiner: MFShape) -> MFShape:
         if joiner is None or joiner.solid is None:
@@ -247,6 +230,93 @@ class MFShape(Shape):
         self.solid = self.solid.hull()
         return self
 
+    def decimate(self, tolerance: float) -> MFShape:
+        self.solid = self.solid.simplify(tolerance)
+        return self
+
+    def num_tri(self) -> int:
+        return self.solid.num_tri()
+
+    def mesh_stats(self) -> tuple[int, float]:
+        return self.solid.num_tri(), self.solid.surface_area()
+
+    def metrics(self, hull: bool = False) -> dict:
+        xmin, ymin, zmin, xmax, ymax, zmax = self.solid.bounding_box()
+        rpt = {
+            "volume": self.solid.volume(),
+            "bounding_box_x": xmax - xmin,
+            "bounding_box_y": ymax - ymin,
+            "bounding_box_z": zmax - zmin,
+            "triangle_count": self.solid.num_tri(),
+        }
+        if hull:
+            rpt["convex_hull_volume"] = self.solid.hull().volume()
+        return rpt
+
+    def to_mesh(self) -> tuple[np.ndarray, np.ndarray]:
+        mesh = self.solid.to_mesh()
+        return mesh.vert_properties[:, :3], mesh.tri_verts
+
+class MFShape2D(Shape2D):
+    """ 2D profile held as a manifold CrossSection """
+
+    def __init__(self, api: MFShapeAPI, section: CrossSection):
+        super().__init__(api)
+        self.section = section
+
+    @classmethod
+    def polygon(cls, api: MFShapeAPI, path: list[tuple[float, float]]) -> MFShape2D:
+        return cls(api, CrossSection([path], FillRule.EvenOdd))
+
+    @classmethod
+    def circle(cls, api: MFShapeAPI, rad: float) -> MFShape2D:
+        segs = cls.segments(api, 2 * pi * rad)
+        return cls(api, CrossSection.circle(rad, circular_segments=segs))
+
+    @classmethod
+    def rect(cls, api: MFShapeAPI, l: float, wth: float) -> MFShape2D:
+        return cls(api, CrossSection.square((l, wth), center=True))
+
+    def cut(self, cutter: MFShape2D) -> MFShape2D:
+        self.section = self.section - cutter.section
+        return self
+
+    def dup(self) -> MFShape2D:
+        # CrossSection objects are immutable
+        return copy.copy(self)
+
+    def join(self, joiner: MFShape2D) -> MFShape2D:
+        self.section = self.section + joiner.section
+        return self
+
+    def intersection(self, intersector: MFShape2D) -> MFShape2D:
+        self.section = self.section ^ intersector.section
+        return self
+
+    def offset(self, delta: float) -> MFShape2D:
+        segs = self.segments(self.api, 2 * pi * abs(delta))
+        self.section = self.section.offset(delta, JoinType.Round, circular_segments=segs)
+        return self
+
+    def mv(self, x: float, y: float) -> MFShape2D:
+        self.section = self.section.translate((x, y))
+        return self
+
+    def rotate(self, ang: float) -> MFShape2D:
+        self.section = self.section.rotate(ang)
+        return self
+
+    def scale(self, x: float, y: float) -> MFShape2D:
+        self.section = self.section.scale((x, y))
+        return self
+
+    def extrude(self, ht: float) -> MFShape:
+        solid = Manifold.extrude(self.section, abs(ht))
+        if ht < 0:
+            solid = solid.translate((0, 0, ht))
+        return MFShape(self.api, solid=solid)
+
+
 class MFBall(MFShape):
     def __init__(self, rad: float, api: MFShapeAPI):
         super().__init__(api)
@@ -254,6 +324,37 @@ class MFBall(MFShape):
         self.solid = Manifold.sphere(rad, circular_segments=segs)
 
 
+class MFEllipsoidSector(MFShape):
+    def __init__(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+        api: MFShapeAPI,
+    ):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * max(*rx, *ry, *rz))
+        # the unit sphere has edges along the coordinate planes,
+        # so each side of an axis can be scaled separately
+        solid = Manifold.sphere(1, circular_segments=segs)
+        for axis, r in enumerate((rx, ry, rz)):
+            for side, rs in ((-1, r[0]), (1, r[1])):
+                if rs <= 0:
+                    normal = [0, 0, 0]
+                    normal[axis] = -side
+                    solid = solid.trim_by_plane(normal, 0)
+        self.solid = solid.warp_batch(lambda v: ellipsoid_sector_scale(v, rx, ry, rz))
+
+
+class MFTorus(MFShape):
+    def __init__(self, r_major: float, r_minor: float, api: MFShapeAPI):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * (r_major + r_minor))
+        minor_segs = self._smoothing_segments(2 * pi * r_minor)
+        ring = CrossSection.circle(r_minor, circular_segments=minor_segs).translate((r_major, 0))
+        self.solid = Manifold.revolve(ring, circular_segments=segs)
+
+
 class MFBox(MFShape):
     def __init__(self, l: float, wth: float, ht: float, center: bool, api: MFShapeAPI ):
         super().__init__(api)
@@ -295,6 +396,14 @@ class MFRodZ(MFShape):
         )
 
 
+class MFRndRodZ(MFShape):
+    def __init__(self, l: float, rad: float, domeRatio: float, api: MFShapeAPI):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * rad)
+        profile = CrossSection([rounded_rod_profile(l, rad, domeRatio, segs)], FillRule.EvenOdd)
+        self.solid = Manifold.revolve(profile, circular_segments=segs)
+
+
 # draw mix of straight lines from pt to pt, or draw spline with [(x,y,dx,dy), ...], then extrude on Z-axis
 class MFLineSplineExtrusionZ(MFShape):
     def __init__(
@@ -9,7 +9,11 @@ from typing import Union
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, test_api
-from b13d.api.utils import gen_stl_foo
+from b13d.api.mesh import save_mesh_npz
+from b13d.api.utils import file_ensure_extension, gen_stl_foo
+
+MOCK_MESH_VERTICES = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)]
+MOCK_MESH_FACES = [(0, 2, 1), (0, 1, 3), (0, 3, 2), (1, 2, 3)]
 
 
 class MockShapeAPI(ShapeAPI):
@@ -18,6 +22,15 @@ class MockShapeAPI(ShapeAPI):
     """
 
     def export(self, shape: MockShape, path: Union[str, Path],fmt=".stl") -> None:
+        if fmt == ".npz":
+            # placeholder tetrahedron, with the metadata of the shape
+            save_mesh_npz(
+                file_ensure_extension(path, ".npz"),
+                MOCK_MESH_VERTICES,
+                MOCK_MESH_FACES,
+                meta={"name": shape.name, "implementation": str(self.implementation)},
+            )
+            return
         return self.export_stl(shape=shape, path=path)
 
     def export_stl(self, shape: MockShape, path: str) -> None:
@@ -26,9 +39,28 @@ class MockShapeAPI(ShapeAPI):
     def export_best(self, shape: MockShape, path: Union[str, Path]) -> None:
         return self.export_stl(shape=shape, path=path)
 
+    def export_3mf(self, shapes: list[MockShape], path: Union[str, Path]) -> None:
+        # empty placeholder package
+        Path(path).touch()
+
+    def export_glb(
+        self,
+        shapes: list[MockShape],
+        path: Union[str, Path],
+        parents: list[int] = None,
+    ) -> None:
+        # empty placeholder scene
+        Path(path).touch()
+
     def sphere(self, r: float) -> MockShape:
         return MockShape(self)
 
+    def torus(self, r_major: float, r_minor: float) -> MockShape:
+        return MockShape(self)
+
+    def instances(self, shape: MockShape, transforms: list[tuple[float, ...]]) -> MockShape:
+        return MockShape(self)
+
     def box(self, l: float, wth: float, ht: float, center: bool = True) -> MockShape:
         return MockShape(self)
 
@@ -93,6 +125,9 @@ class MockShapeAPI(ShapeAPI):
         assert isinstance(extrude, (int, float))
         return MockShape(self)
 
+    def mesh_shape(self, vertices, faces) -> MockShape:
+        return MockShape(self)
+
     def genShape(self, solid) -> MockShape:
         """ Currently just mimics SolidPython2 implementation """
         return MockShape(self)
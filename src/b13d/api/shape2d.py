@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+    Shapely based 2D profiles, default Shape2D for implementations without a native 2D kernel
+"""
+
+from __future__ import annotations
+import copy
+from math import ceil, pi
+import os
+import sys
+
+from shapely import affinity
+from shapely.geometry import Point, Polygon, box
+from shapely.geometry.base import BaseGeometry
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from b13d.api.core import Shape, Shape2D, ShapeAPI
+
+
+class ShapelyShape2D(Shape2D):
+    """ 2D profile held as a shapely geometry """
+
+    def __init__(self, api: ShapeAPI, geom: BaseGeometry):
+        super().__init__(api)
+        self.geom = geom
+
+    @classmethod
+    def polygon(cls, api: ShapeAPI, path: list[tuple[float, float]]) -> ShapelyShape2D:
+        return cls(api, Polygon(path))
+
+    @classmethod
+    def circle(cls, api: ShapeAPI, rad: float) -> ShapelyShape2D:
+        segs = cls.segments(api, 2 * pi * rad)
+        return cls(api, Point(0, 0).buffer(rad, quad_segs=max(1, ceil(segs / 4))))
+
+    @classmethod
+    def rect(cls, api: ShapeAPI, l: float, wth: float) -> ShapelyShape2D:
+        return cls(api, box(-l / 2, -wth / 2, l / 2, wth / 2))
+
+    def cut(self, cutter: ShapelyShape2D) -> ShapelyShape2D:
+        self.geom = self.geom.difference(cutter.geom)
+        return self
+
+    def dup(self) -> ShapelyShape2D:
+        # shapely geometries are immutable
+        return copy.copy(self)
+
+    def join(self, joiner: ShapelyShape2D) -> ShapelyShape2D:
+        self.geom = self.geom.union(joiner.geom)
+        return self
+
+    def intersection(self, intersector: ShapelyShape2D) -> ShapelyShape2D:
+        self.geom = self.geom.intersection(intersector.geom)
+        return self
+
+    def offset(self, delta: float) -> ShapelyShape2D:
+        segs = self.segments(self.api, 2 * pi * abs(delta))
+        self.geom = self.geom.buffer(delta, quad_segs=max(1, ceil(segs / 4)))
+        return self
+
+    def mv(self, x: float, y: float) -> ShapelyShape2D:
+        self.geom = affinity.translate(self.geom, x, y)
+        return self
+
+    def rotate(self, ang: float) -> ShapelyShape2D:
+        self.geom = affinity.rotate(self.geom, ang, origin=(0, 0))
+        return self
+
+    def scale(self, x: float, y: float) -> ShapelyShape2D:
+        self.geom = affinity.scale(self.geom, x, y, origin=(0, 0))
+        return self
+
+    def polygons(self) -> list[Polygon]:
+        """ the non empty polygons of the profile """
+        geoms = getattr(self.geom, "geoms", [self.geom])
+        return [g for g in geoms if isinstance(g, Polygon) and not g.is_empty]
+
+    def extrude(self, ht: float) -> Shape:
+        # one extrusion per outline, holes are cut with a slightly taller extrusion
+        tol = self.api.tolerance()
+        solid = None
+        for poly in self.polygons():
+            part = self.api.polygon_extrusion(list(poly.exterior.coords)[:-1], abs(ht))
+            for hole in poly.interiors:
+                part -= self.api.polygon_extrusion(list(hole.coords)[:-1], abs(ht) + 2 * tol).mv(0, 0, -tol)
+            solid = part + solid
+        if ht < 0:
+            solid = solid.mv(0, 0, ht)
+        return solid
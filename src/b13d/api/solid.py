@@ -9,23 +9,46 @@ from __future__ import annotations
 import datetime
 import importlib
 import platform
+import subprocess
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from math import sqrt
 import trimesh
 from json_tricks import dumps
 
 from pathlib import Path
 from abc import ABC, abstractmethod
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, BooleanOptionalAction, Namespace
 from copy import deepcopy
 
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
                 
+from b13d.api.archive import ExportArchive
+from b13d.api.bbox import bbox_size
+from b13d.api.build_manifest import export_if_changed, shapes_digest
 from b13d.api.core import ShapeAPI, Shape, Fidelity, Implementation, StringEnum, supported_apis
 from b13d.api.constants import ColorEnum, FIT_TOL, FILLET_RAD, DEFAULT_BUILD_DIR, DEFAULT_TEST_DIR, ColorEnum
+from b13d.api.trace import Tracer
 from b13d.api.utils import make_or_exist_path, wait_assert_file_exist
 from b13d.conversion.scad2stl import scad2stl_parser
+from b13d.conversion.stlbin_metrics import stl_bin_metrics
+
+# solids being generated, innermost last
+_GENERATING: list = []
+
+# part streams writing the parts of the solids being generated, innermost last
+_STREAMS: list = []
+
+# largest tolerance relaxation, as a multiple of the fidelity tolerance, to reach a decimation ratio
+DECIMATE_MAX_TOLERANCE = 64
+
+# regenerations to reach the triangle budget, and the relative miss accepted
+TRIANGLE_BUDGET_PASSES = 2
+TRIANGLE_BUDGET_TOLERANCE = 0.05
 
 MAX_SECTION = 1000
 SECTION_LIMITS = [-MAX_SECTION, MAX_SECTION]
@@ -35,12 +58,82 @@ def main_maker(module_name, class_name, args=None):
     module = importlib.import_module(module_name)
     class_ = getattr(module, class_name)
     solid = class_(args=args)
-    solid.export_args()  # includes export_configuration for LeleBase
-    out_fname = solid.export_stl()
-    if not solid.cli.export is None:
-        solid.export(fmt=solid.cli.export)
+    with Tracer(part=generating_part) if solid.cli.trace else nullcontext() as tracer:
+        if solid.cli.preview:
+            # coarse build now, the target fidelity is built in the background
+            solid.cli.fidelity = Fidelity.PREVIEW
+        elif solid.cli.triangle_budget is not None:
+            solid.apply_triangle_budget()
+        archive = None
+        if solid.cli.archive:
+            archive = ExportArchive(solid._make_out_path() + ".zip")
+        args_fnames = solid.export_args()  # includes export_configuration for LeleBase
+        if archive is not None:
+            for fname in args_fnames:
+                archive.add(fname)
+        if solid.cli.stream:
+            with PartStream(
+                solid._make_out_path(),
+                ".stl",
+                archive,
+                free=solid.cli.stream_free,
+                threaded=solid.cli.implementation.has_threads(),
+            ):
+                out_fname = solid.export_stl(archive=archive)
+        else:
+            out_fname = solid.export_stl(archive=archive)
+        if not solid.cli.export is None:
+            solid.export(fmt=solid.cli.export, archive=archive)
+    if tracer is not None:
+        trace_fname = tracer.save(
+            os.path.join(solid._make_out_path(), solid.fileNameBase + "_trace.json")
+        )
+        print(f"Trace: {trace_fname}")
+        if archive is not None:
+            archive.add(trace_fname)
+    if archive is not None:
+        print(f"Archive: {archive.close()}")
+    if solid.cli.preview:
+        solid.refine_procs = refine_in_background(solid, module_name, class_name, args)
     return solid, out_fname
 
+# part written by the current part stream thread
+_WRITING = threading.local()
+
+def generating_part() -> str:
+    """Name of the part written by this stream thread, else of the innermost solid being generated"""
+    writing = getattr(_WRITING, "part", None)
+    if writing is not None:
+        return writing
+    return _GENERATING[-1].fileNameBase if _GENERATING else None
+
+def refine_in_background(solid, module_name, class_name, args=None) -> list[subprocess.Popen]:
+    """Rebuild a previewed solid, or the parts selected with --refine, at the target fidelity"""
+    largs = list(sys.argv[1:] if args is None else args) + ["--no-preview"]
+
+    targets = [(module_name, class_name, largs)]
+    if solid.cli.refine:
+        targets = []
+        for part in solid.exported_solids():
+            if part.fileNameBase in solid.cli.refine:
+                pargs = largs + (["-C"] if part.isCut else [])
+                targets.append((type(part).__module__, type(part).__name__, pargs))
+
+    if not targets:
+        print(f"# WARNING: no part of {class_name} matches --refine {solid.cli.refine}")
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(os.path.dirname(__file__), "../../"), env.get("PYTHONPATH", "")]
+    )
+    procs = []
+    for mod, cls, pargs in targets:
+        cmd = f"from b13d.api.solid import main_maker; main_maker({mod!r}, {cls!r}, {pargs!r})"
+        proc = subprocess.Popen([sys.executable, "-c", cmd], env=env)
+        print(f"# Refining {cls} in background, pid {proc.pid}")
+        procs.append(proc)
+    return procs
+
 def test_iteration(module, component, test, api, args=None):
     """Helper to generate a testcase launching the main function in a module"""
     mod = importlib.import_module(module)
@@ -92,6 +185,67 @@ def test_loop(module, apis=None, tests=None):  # ,component):
         test_count += 1
 
 
+class PartStream:
+    """
+    Writes the parts of each assembly from a background thread as soon as
+    the assembly is generated, while the generation of the next solids goes on
+    """
+
+    def __init__(
+        self,
+        out_path: str,
+        fmt: str,
+        archive: ExportArchive = None,
+        free: bool = False,
+        threaded: bool = True,
+    ):
+        self.out_path = out_path
+        self.fmt = fmt
+        self.archive = archive
+        # drop the shape of a part once written, its assembly is already generated
+        self.free = free
+        self.futures: list[Future] = []
+        # implementations bound to the main thread (bpy) or unsafe across threads (OCCT) write in place
+        self.executor = None
+        if threaded:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="part-stream")
+
+    def submit(self, part: Solid) -> None:
+        """Queue the current shape of a generated part"""
+        part.streamed = self.fmt
+        shape = part.shape.dup()
+        if self.free:
+            part.shape = None
+        if self.executor is None:
+            part.write_shape(shape, self.fmt, self.out_path, self.archive, self.free)
+        else:
+            self.futures.append(self.executor.submit(self._write, part, shape))
+
+    def _write(self, part: Solid, shape: Shape) -> None:
+        _WRITING.part = part.fileNameBase
+        try:
+            part.write_shape(shape, self.fmt, self.out_path, self.archive, self.free)
+        finally:
+            _WRITING.part = None
+
+    def close(self) -> None:
+        """Wait for the queued parts, raising the first write error"""
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+    def __enter__(self) -> PartStream:
+        _STREAMS.append(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _STREAMS.remove(self)
+        self.close()
+
+
 class PrettyPrintDict(dict):
     """A class to print all entries of a dict"""
 
@@ -114,15 +268,23 @@ def export_dict2text(outpath, fname, dictdata, fmt='.txt') -> str:
 
     out_fname = os.path.join(outpath, fname+fmt)
     print(out_fname)
+    if fmt=='.txt':
+        text = repr(dictdata)
+    elif fmt=='.json':
+        text = dumps( dictdata, indent=4 )
+    else:
+        assert fmt in ['.txt','.json'], f'ERROR: export format {fmt} not supported!'
+
+    if os.path.isfile(out_fname):
+        with open(out_fname, encoding="UTF8") as f:
+            if f.read() == text:
+                # leave identical files untouched
+                return out_fname
     with open(out_fname, "w", encoding="UTF8") as f:
-        if fmt=='.txt':
-            f.write(repr(dictdata))
-        elif fmt=='.json':
-            f.write( dumps( dictdata, indent=4 ) )
-        else:
-            assert fmt in ['.txt','.json'], f'ERROR: export format {fmt} not supported!'
+        f.write(text)
 
     assert os.path.isfile(out_fname)
+    return out_fname
 
 def volume_match_reference(
     volume: float,
@@ -139,32 +301,52 @@ def volume_match_reference(
 
     return False
 
-def stl_report_metrics(out_fname: str) -> dict:
+def stl_report_metrics(out_fname: str, hull: bool = True) -> dict:
     assert os.path.isfile(out_fname), f"File {out_fname} does not exist!!!"
-    mesh = trimesh.load_mesh(out_fname)
-    # assert mesh.is_watertight
-    print(f"mesh_volume: {mesh.volume}")
-    print(f"mesh.convex_hull.volume: {mesh.convex_hull.volume}")
-    print(f"mesh.bounding_box: {mesh.bounding_box.extents}")
-    # mesh.show() does not work
-    rpt = {}
-    rpt["volume"] = mesh.volume
-    rpt["convex_hull_volume"] = mesh.convex_hull.volume
-    rpt["bounding_box_x"] = mesh.bounding_box.extents[0]
-    rpt["bounding_box_y"] = mesh.bounding_box.extents[1]
-    rpt["bounding_box_z"] = mesh.bounding_box.extents[2]
+    # binary files are read in chunks without building a mesh
+    rpt = stl_bin_metrics(out_fname, hull=hull)
+    if rpt is None:
+        mesh = trimesh.load_mesh(out_fname)
+        # assert mesh.is_watertight
+        # mesh.show() does not work
+        rpt = {}
+        rpt["volume"] = mesh.volume
+        if hull:
+            rpt["convex_hull_volume"] = mesh.convex_hull.volume
+        rpt["bounding_box_x"] = mesh.bounding_box.extents[0]
+        rpt["bounding_box_y"] = mesh.bounding_box.extents[1]
+        rpt["bounding_box_z"] = mesh.bounding_box.extents[2]
+        rpt["triangle_count"] = len(mesh.faces)
+    print_metrics(rpt)
     return rpt
 
+def print_metrics(rpt: dict):
+    """Print volume, hull and bounding box metrics"""
+    print(f"mesh_volume: {rpt['volume']}")
+    if "convex_hull_volume" in rpt:
+        print(f"mesh.convex_hull.volume: {rpt['convex_hull_volume']}")
+    print(f"mesh.bounding_box: {[rpt['bounding_box_' + a] for a in 'xyz']}")
+
 def stl_check_volume(
     out_fname: str,
     check_en: bool = True,
     reference_volume: float = None,
-    reference_volume_tolerance: float = 10
+    reference_volume_tolerance: float = 10,
+    shape: Shape = None,
+    hull: bool = False,
 ) -> dict:
-    """Check the volume of an .stl mesh against a reference value"""
+    """
+    Check the volume of an .stl mesh against a reference value.
+    Metrics come from the exported shape when its implementation provides them,
+    else from reloading the .stl file.
+    """
     rpt = {}
     if check_en:
-        rpt = stl_report_metrics(out_fname)
+        rpt = None if shape is None else shape.metrics(hull=hull)
+        if rpt is None:
+            rpt = stl_report_metrics(out_fname, hull=hull)
+        else:
+            print_metrics(rpt)
         rpt['pass'] = volume_match_reference(
             volume=rpt['volume'],
             reference=reference_volume,
@@ -188,6 +370,16 @@ def solid_operand(joiner)->ShapeAPI:
     if isinstance(joiner, ShapeAPI):
         return joiner
 
+def part_fidelity_arg(arg: str) -> tuple[str, Fidelity]:
+    """Parse a NAME=FIDELITY part fidelity override"""
+    name, _, fidelity = arg.partition("=")
+    return name, Fidelity(fidelity)
+
+def part_ratio_arg(arg: str) -> tuple[str, float]:
+    """Parse a NAME=RATIO part decimation target"""
+    name, _, ratio = arg.partition("=")
+    return name, float(ratio)
+
 def lele_solid_parser(parser=None):
     """
     Solid Command Line Interface
@@ -212,6 +404,63 @@ def lele_solid_parser(parser=None):
         choices=list(Fidelity),
         default=Fidelity.LOW,
     )
+    parser.add_argument(
+        "-pf",
+        "--part_fidelity",
+        help="Fidelity override of a part and the solids it generates, as NAME=FIDELITY",
+        nargs="+",
+        type=part_fidelity_arg,
+        default=[],
+    )
+    parser.add_argument(
+        "-tb",
+        "--triangle_budget",
+        help="Total triangle count to distribute across the exported parts "
+        + "by surface area and importance",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "-dec",
+        "--decimate",
+        help="Simplify exported meshes, moving surfaces by less than the fidelity tolerance",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-decr",
+        "--decimate_ratio",
+        help="Target triangle ratio of a part after decimation, as NAME=RATIO. "
+        + f"The tolerance is relaxed up to {DECIMATE_MAX_TOLERANCE}x the fidelity tolerance to reach it",
+        nargs="+",
+        type=part_ratio_arg,
+        default=[],
+    )
+    parser.add_argument(
+        "-lv",
+        "--levels",
+        help="Also export one file per fidelity level, "
+        + "cadquery tessellates a single BRep generation at each level",
+        nargs="+",
+        type=Fidelity,
+        choices=list(Fidelity),
+        default=None,
+    )
+    parser.add_argument(
+        "-prv",
+        "--preview",
+        help="Fast coarse build first (capped segments, no fillets, text as boxes), "
+        + "then rebuild at the selected fidelity in the background",
+        action=BooleanOptionalAction,
+        default=False,
+    )
+    parser.add_argument(
+        "-rf",
+        "--refine",
+        help="With --preview, only rebuild these parts (file name bases) in the background",
+        nargs="+",
+        type=str,
+        default=None,
+    )
     parser.add_argument(
         "-c",
         "--color",
@@ -240,6 +489,41 @@ def lele_solid_parser(parser=None):
         type=str,
         default=None,
     )
+    parser.add_argument(
+        "-rw",
+        "--rewrite",
+        help="Rewrite exported files even when the build manifest shows they are unchanged",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-stm",
+        "--stream",
+        help="Write the parts of each assembly from a background thread "
+        + "as soon as the assembly is generated, "
+        + "from the main thread for cadquery and blender",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-stmf",
+        "--stream_free",
+        help="With --stream, drop the shape of each part once written, "
+        + "packaged exports regenerate them",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-trc",
+        "--trace",
+        help="Record every shape operation (part, triangle counts, wall time, memory) "
+        + "into a Chrome trace <name>_trace.json next to the report",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-zip",
+        "--archive",
+        help="Also pack the exported files, with a manifest of their hashes and metrics, "
+        + "into one .zip compressed in the background while the build runs",
+        action="store_true",
+    )
     parser.add_argument(
         "-C",
         "--is_cut",
@@ -270,6 +554,12 @@ def lele_solid_parser(parser=None):
         help="Calculate output mesh volume for report",
         action="store_true",
     )
+    parser.add_argument(
+        "-stlh",
+        "--stl_check_hull",
+        help="Also report the convex hull volume of the output mesh",
+        action="store_true",
+    )
     parser.add_argument(
         "-refv",
         "--reference_volume",
@@ -308,7 +598,15 @@ class Solid(ABC):
     fileNameBase : str = ''
     api          : ShapeAPI = None
     shape        : Shape = None
+    # shape written by the last export, after decimation
+    export_shape : Shape = None
+    # format already written by a part stream
+    streamed     : str = None
+    # background rebuilds launched after a preview
+    refine_procs : list = None
     parts        : list = None
+    # weight of this part in the triangle budget, per unit of surface area
+    importance   : float = 1.0
 
     def __init__(
         self,
@@ -423,8 +721,21 @@ class Solid(ABC):
                 self.check_has_api()
                 print(f"# Done configuring API! {self.fileNameBase}")
 
-            self.shape = self.gen()
+            # solids configured while generating inherit this solid fidelity
+            _GENERATING.append(self)
+            try:
+                self.shape = self.gen()
+            finally:
+                _GENERATING.pop()
             print(f"# Done generating shape! {self.fileNameBase}")
+            self.check_has_shape()
+            self.gen_section()
+            if _STREAMS:
+                # the parts of this assembly are final, write them while generation goes on
+                for part in self.exported_solids()[1:]:
+                    if part.streamed is None and part.has_shape():
+                        _STREAMS[-1].submit(part)
+            return self.shape
         self.check_has_shape()
         self.gen_section()
         return self.shape
@@ -441,12 +752,96 @@ class Solid(ABC):
 
     def configure(self):
         """Configure Solid, and save self.cli"""
-        self.api:ShapeAPI = self.cli.implementation.get_api(self.cli.fidelity)
+        self.api:ShapeAPI = self.cli.implementation.get_api(self.part_fidelity())
         self.check_has_api()
+        self.api.segment_scale = self.part_segment_scale()
         if self.cli.implementation == Implementation.SOLID2:
             self.api.setCommand(self.cli.openscad)
             self.api.setImplicit(self.cli.implicit)
 
+    def _generating_parent(self) -> Solid:
+        """The configured solid whose generation is building this one, if any"""
+        if _GENERATING and _GENERATING[-1].has_api():
+            return _GENERATING[-1]
+        return None
+
+    def part_fidelity(self) -> Fidelity:
+        """Fidelity override of this part, else the fidelity of the solid generating it"""
+        if self.cli.fidelity.is_preview():
+            return self.cli.fidelity
+        for name, fidelity in self.cli.part_fidelity:
+            if name == self.fileNameBase:
+                return fidelity
+        parent = self._generating_parent()
+        return self.cli.fidelity if parent is None else parent.api.fidelity
+
+    def part_segment_scale(self) -> float:
+        """Segment scale of this part from the triangle budget, else inherited"""
+        scales = getattr(self.cli, "segment_scales", None) or {}
+        if self.fileNameBase in scales:
+            return scales[self.fileNameBase]
+        parent = self._generating_parent()
+        return 1.0 if parent is None else parent.api.segment_scale
+
+    def part_tree(self) -> list[tuple[Solid, int]]:
+        """This solid and the parts exported with it, each with the index of its parent"""
+        tree = [(self, -1)]
+
+        def walk(parts: list, parent: int):
+            last = parent
+            for part in parts:
+                if isinstance(part, list):
+                    # add_part() appends the parts of a sub assembly after it
+                    walk(part, last)
+                elif isinstance(part, Solid):
+                    tree.append((part, parent))
+                    last = len(tree) - 1
+
+        walk(self.get_parts(), 0)
+        return tree
+
+    def exported_solids(self) -> list[Solid]:
+        """This solid followed by the parts exported with it"""
+        return [solid for solid, _ in self.part_tree()]
+
+    def apply_triangle_budget(self):
+        """Regenerate with segment counts scaled so the exported parts share cli.triangle_budget"""
+        budget = self.cli.triangle_budget
+        self.gen_full()
+        parts = self.exported_solids()
+        # each file holds the shape of its own solid, an assembly does not include
+        # the parts exported separately, so every file shares the budget
+        stats = [part.gen_full().mesh_stats() for part in parts]
+        if None in stats:
+            print(f"# WARNING: triangle budget not supported by {self.cli.implementation} api")
+            return
+
+        weights = [part.importance * area for part, (_, area) in zip(parts, stats)]
+        scales = {}
+        for part, (tris, _), weight in zip(parts, stats, weights):
+            share = budget * weight / sum(weights)
+            # curved surfaces are subdivided along two directions
+            scales[part.fileNameBase] = part.api.segment_scale * sqrt(share / max(tris, 1))
+
+        for npass in range(TRIANGLE_BUDGET_PASSES):
+            # regenerate the whole tree with the scaled segment counts
+            self.cli.segment_scales = scales
+            self.shape = None
+            self.api = None
+            self.parts = None
+            self.gen_full()
+            parts = self.exported_solids()
+            counts = {part.fileNameBase: part.gen_full().mesh_stats()[0] for part in parts}
+            tris = sum(counts.values())
+            if npass == TRIANGLE_BUDGET_PASSES - 1 or abs(tris - budget) <= TRIANGLE_BUDGET_TOLERANCE * budget:
+                break
+            # flat faces do not follow the segment counts, correct the first estimate
+            scales = {name: scale * sqrt(budget / tris) for name, scale in scales.items()}
+
+        print(f"# Triangle budget {budget}: {tris} triangles")
+        for name, count in counts.items():
+            print(f"#   {name}: {count}")
+
     def cut(self, cutter: Solid) -> Solid:
         """ Cut solid with other shape """
         self.gen_full()
@@ -469,6 +864,9 @@ class Solid(ABC):
         make_or_exist_path(main_out_path)
 
         outfname = self.fileNameBase
+        if self.cli.fidelity.is_preview() and self.cli.outdir_date_off:
+            # keep previews apart from the refined build
+            outfname += "_preview"
         if not self.cli.outdir_date_off:
             outfname += (
                 (datetime.datetime.now().strftime("-%y%m%d-%H%M%S-"))
@@ -479,24 +877,25 @@ class Solid(ABC):
         make_or_exist_path(out_path)
         return out_path
 
-    def export_args(self):
-        """Export Pylele Solid input arguments"""
-        export_dict2text(
+    def export_args(self) -> list[str]:
+        """Export Pylele Solid input arguments, returns the written files"""
+        return [export_dict2text(
             outpath=self._make_out_path(),
             fname=self.fileNameBase + "_args",
             dictdata=self.cli,
             fmt='.json'
-        )
+        )]
 
     def export_stl(
         self,
         out_path=None,
         report_en=True,
+        archive: ExportArchive = None,
     ) -> str:
         """Generate .stl output file"""
         start_time = time.time()
 
-        out_fname=self.export(fmt='.stl', out_path=out_path)
+        out_fname=self.export(fmt='.stl', out_path=out_path, archive=archive)
         out_path, _ = os.path.split(out_fname)
 
         # checks
@@ -506,8 +905,15 @@ class Solid(ABC):
             and not self.cli.implementation == Implementation.MOCK,
             reference_volume=self.cli.reference_volume,
             reference_volume_tolerance=self.cli.reference_volume_tolerance,
+            shape=self.export_shape,
+            hull=self.cli.stl_check_hull,
         )
 
+        # analytic dimensions, known without inspecting the mesh
+        size = bbox_size(self.shape.bbox) if self.has_shape() else None
+        if size is not None:
+            rpt["analytic_bbox_x"], rpt["analytic_bbox_y"], rpt["analytic_bbox_z"] = size
+
         end_time = time.time()
         # get the execution time
         render_time = end_time - start_time
@@ -518,34 +924,129 @@ class Solid(ABC):
         rpt |= platform.uname()._asdict()
 
         if report_en:
-            export_dict2text(
+            rpt_fname = export_dict2text(
                 outpath=out_path, fname=self.fileNameBase + "_rpt", dictdata=rpt,fmt='.json'
             )
+            if archive is not None:
+                archive.add(rpt_fname)
+
+        return out_fname
+
+    def decimated_shape(self, shape: Shape = None) -> Shape:
+        """Shape to export, simplified when decimation is enabled for this part"""
+        source = self.shape if shape is None else shape
+        ratio = dict(self.cli.decimate_ratio).get(self.fileNameBase)
+        if not self.cli.decimate and ratio is None:
+            return source
+
+        tol = self.api.fidelity.tolerance()
+        shape = source.dup().decimate(tol)
+        before, after = source.mesh_stats(), shape.mesh_stats()
+        if before is None or after is None:
+            return shape
+
+        # always decimate the original, errors of successive passes would add up
+        max_tol = DECIMATE_MAX_TOLERANCE * self.api.fidelity.tolerance()
+        while ratio is not None and after[0] > ratio * before[0] and tol < max_tol:
+            tol *= 2
+            shape = source.dup().decimate(tol)
+            after = shape.mesh_stats()
+        print(f"# Decimated {self.fileNameBase}: {before[0]} -> {after[0]} triangles, tolerance {tol}")
+        return shape
+
+    def export_digest(self, shapes: list[Shape], **args) -> str:
+        """Hash of the meshes and export args of an export, None to compare the written files"""
+        return shapes_digest(
+            shapes,
+            implementation=self.cli.implementation,
+            names=[s.name for s in shapes],
+            colors=[s.color for s in shapes],
+            **args,
+        )
+
+    def write_shape(
+        self,
+        shape: Shape,
+        fmt: str,
+        out_path: str,
+        archive: ExportArchive = None,
+        free: bool = False,
+    ) -> str:
+        """Write the file of this solid from a generated shape, without its parts"""
+        out_fname = os.path.join(out_path, self.fileNameBase + fmt)
+        shape = self.decimated_shape(shape)
+        export_if_changed(
+            out_fname,
+            lambda path: self.api.export(shape, path=path, fmt=fmt),
+            self.export_digest([shape], fmt=fmt),
+            rewrite=self.cli.rewrite,
+        )
+        if not free:
+            self.export_shape = shape
 
+        # potential timing issues with generating STL files
+        wait_assert_file_exist(fname=out_fname)
+        if archive is not None:
+            archive.add(out_fname, metrics=shape.metrics())
+
+        if self.cli.levels:
+            level_fnames = self.api.export_levels(
+                shape,
+                path=os.path.join(out_path, self.fileNameBase),
+                fidelities=self.cli.levels,
+                fmt=fmt,
+            )
+            if archive is not None:
+                for fname in level_fnames:
+                    archive.add(fname)
         return out_fname
 
     def export(
         self,
         fmt: str,
         out_path=None,
+        archive: ExportArchive = None,
     ) -> str:
-        """Generate output file"""
+        """Generate output file, queued into archive when given"""
         if out_path is None:
             out_path = self._make_out_path()
         out_fname = os.path.join(out_path, self.fileNameBase + fmt)
         print(f"Output File: {out_fname}")
 
-        self.gen_full()
-        self.api.export(self.shape, path=out_fname, fmt=fmt)
+        if fmt in (".3mf", ".glb") and self.cli.implementation.has_mesh():
+            # a single package holds this solid and all its parts
+            tree = self.part_tree()
+            shapes = []
+            for part, _ in tree:
+                part.gen_full()
+                shapes.append(part.decimated_shape().set_name(part.fileNameBase))
+            parents = [parent for _, parent in tree]
+            if fmt == ".3mf":
+                write = lambda path: self.api.export_3mf(shapes, path)
+            else:
+                write = lambda path: self.api.export_glb(shapes, path, parents=parents)
+            export_if_changed(
+                out_fname,
+                write,
+                self.export_digest(shapes, fmt=fmt, parents=parents),
+                rewrite=self.cli.rewrite,
+            )
+            wait_assert_file_exist(fname=out_fname)
+            if archive is not None:
+                archive.add(out_fname)
+            return out_fname
 
-        # potential timing issues with generating STL files
-        wait_assert_file_exist(fname=out_fname)
+        if self.streamed == fmt:
+            print(f"# Streamed: {out_fname}")
+        else:
+            self.gen_full()
+            self.write_shape(self.shape, fmt, out_path, archive)
 
         if self.has_parts():
             # this is an assembly, generate other parts
             for part in self.parts:
                 if isinstance(part, Solid):
-                    part.export(fmt=fmt, out_path=out_path)
+                    part.export(fmt=fmt, out_path=out_path, archive=archive)
                 else:
                     print(
                         f"# WARNING: Cannot export {fmt} of class {type(part)} in assembly {self}"
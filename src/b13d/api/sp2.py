@@ -2,22 +2,26 @@
 
 from __future__ import annotations
 import copy
-from math import pi, sqrt, ceil
+from math import pi, sqrt, ceil, cos, sin
 import os
 from pathlib import Path
 import sys
 from typing import Union
 
 try:
-    from solid2 import cube, sphere, polygon, text, cylinder, import_
+    from solid2 import cube, sphere, polygon, polyhedron, text, cylinder, import_, union
+    from solid2 import linear_extrude, offset
     from solid2.extensions.bosl2 import circle
 except:
     # only a subset allowed when using implicitcad
-    from solid2 import cube, sphere, polygon, cylinder
+    from solid2 import cube, sphere, polygon, polyhedron, cylinder, union
+    from solid2 import linear_extrude, offset
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
-from b13d.api.core import ShapeAPI, Shape, test_api, Direction
+from b13d.api.bbox import regpoly_bbox_rules
+from b13d.api.core import ShapeAPI, Shape, Shape2D, test_api, Direction
+from b13d.api.mesh import ellipsoid_sector_mesh, rounded_rod_profile
 from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY
 from b13d.conversion.stlascii2stlbin import stlascii2stlbin
 from b13d.conversion.scad2stl import scad2stl, OPENSCAD
@@ -28,6 +32,9 @@ class Sp2ShapeAPI(ShapeAPI):
     SolidPython2 Pylele API implementation for test
     """
 
+    # Sp2Cone polygons have a circumradius of rad * sqrt(2)
+    bbox_rules = regpoly_bbox_rules(lambda rad, sides: rad * sqrt(2))
+
     command = OPENSCAD
     implicit = False
 
@@ -68,9 +75,33 @@ class Sp2ShapeAPI(ShapeAPI):
         assert os.path.isfile(fout), f"ERROR: file {fout} does not exist!"
         return fout
 
+    def _shape2d(self) -> type[Sp2Shape2D]:
+        return Sp2Shape2D
+
     def sphere(self, r: float) -> Sp2Shape:
         return Sp2Ball(r, self)
 
+    def ellipsoid_sector(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+    ) -> Sp2Shape:
+        return Sp2EllipsoidSector(rx, ry, rz, api=self)
+
+    def torus(self, r_major: float, r_minor: float) -> Sp2Shape:
+        return Sp2Torus(r_major, r_minor, api=self)
+
+    def instances(self, shape: Sp2Shape, transforms: list[tuple[float, ...]]) -> Sp2Shape:
+        placed = shape.dup()
+        placed.solid = union()(
+            *[
+                shape.solid.scale(list(t[3:]) if len(t) > 3 else [1, 1, 1]).translate(list(t[:3]))
+                for t in transforms
+            ]
+        )
+        return placed
+
     def box(self, l: float, wth: float, ht: float, center: bool = True) -> Sp2Shape:
         retval = Sp2Box(l, wth, ht, self)
         if center:
@@ -173,7 +204,7 @@ class Sp2Shape(Shape):
         return self
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.segments(dim)
 
     def mirror(self) -> Sp2Shape:
         cmirror = self.solid.mirror([0, 1, 0])
@@ -219,6 +250,63 @@ class Sp2Shape(Shape):
             self.solid = self.solid.color(c)
         return self
 
+class Sp2Shape2D(Shape2D):
+    """ 2D profile held as an OpenSCAD 2D object """
+
+    def __init__(self, api: Sp2ShapeAPI, profile):
+        super().__init__(api)
+        self.profile = profile
+
+    @classmethod
+    def polygon(cls, api: Sp2ShapeAPI, path: list[tuple[float, float]]) -> Sp2Shape2D:
+        return cls(api, polygon(path))
+
+    @classmethod
+    def circle(cls, api: Sp2ShapeAPI, rad: float) -> Sp2Shape2D:
+        segs = cls.segments(api, 2 * pi * rad)
+        return cls.polygon(
+            api, [(rad * cos(2 * pi * i / segs), rad * sin(2 * pi * i / segs)) for i in range(segs)]
+        )
+
+    def cut(self, cutter: Sp2Shape2D) -> Sp2Shape2D:
+        self.profile = self.profile - cutter.profile
+        return self
+
+    def dup(self) -> Sp2Shape2D:
+        return copy.copy(self)
+
+    def join(self, joiner: Sp2Shape2D) -> Sp2Shape2D:
+        self.profile = self.profile + joiner.profile
+        return self
+
+    def intersection(self, intersector: Sp2Shape2D) -> Sp2Shape2D:
+        self.profile = self.profile & intersector.profile
+        return self
+
+    def offset(self, delta: float) -> Sp2Shape2D:
+        segs = self.segments(self.api, 2 * pi * abs(delta))
+        self.profile = offset(r=delta, _fn=segs)(self.profile)
+        return self
+
+    def mv(self, x: float, y: float) -> Sp2Shape2D:
+        self.profile = self.profile.translate([x, y])
+        return self
+
+    def rotate(self, ang: float) -> Sp2Shape2D:
+        self.profile = self.profile.rotate(ang)
+        return self
+
+    def scale(self, x: float, y: float) -> Sp2Shape2D:
+        self.profile = self.profile.scale([x, y])
+        return self
+
+    def extrude(self, ht: float) -> Sp2Shape:
+        solid = linear_extrude(height=abs(ht))(self.profile)
+        if ht < 0:
+            solid = solid.translate([0, 0, ht])
+        return Sp2Shape(self.api, solid=solid)
+
+
 class Sp2Ball(Sp2Shape):
     def __init__(self, rad: float, api: Sp2ShapeAPI):
         super().__init__(api)
@@ -226,6 +314,35 @@ class Sp2Ball(Sp2Shape):
         self.solid = sphere(rad, _fn=self._smoothing_segments(2 * pi * rad))
 
 
+class Sp2EllipsoidSector(Sp2Shape):
+    def __init__(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+        api: Sp2ShapeAPI,
+    ):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * max(*rx, *ry, *rz))
+        verts, faces = ellipsoid_sector_mesh(rx, ry, rz, segs)
+        # openscad wants faces clockwise seen from outside
+        self.solid = polyhedron(
+            points=verts.tolist(), faces=[list(reversed(f)) for f in faces.tolist()]
+        )
+
+
+class Sp2Torus(Sp2Shape):
+    def __init__(self, r_major: float, r_minor: float, api: Sp2ShapeAPI):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * (r_major + r_minor))
+        minor_segs = self._smoothing_segments(2 * pi * r_minor)
+        ring = [
+            (r_major + r_minor * cos(2 * pi * i / minor_segs), r_minor * sin(2 * pi * i / minor_segs))
+            for i in range(minor_segs)
+        ]
+        self.solid = polygon(ring).rotate_extrude(_fn=segs)
+
+
 class Sp2Box(Sp2Shape):
     def __init__(self, ln: float, wth: float, ht: float, api: Sp2ShapeAPI):
         super().__init__(api)
@@ -323,16 +440,9 @@ class Sp2RndRodZ(Sp2Shape):
         self.rad = rad
         self.domeRatio = domeRatio
 
-        stem_len = l - 2*rad*domeRatio
-        rod = None
         segs = self._smoothing_segments(2 * pi * rad)
-        for bz in [stem_len/2, -stem_len/2]:
-            ball = sphere(rad, _fn=segs).scale([1, 1, domeRatio]).translate([0, 0, bz])
-            if rod is None:
-                rod = ball
-            else:
-                rod += ball
-        self.solid = rod.hull()
+        profile = rounded_rod_profile(l, rad, domeRatio, segs)
+        self.solid = polygon(profile).rotate_extrude(_fn=segs)
 
 
 class Sp2TextZ(Sp2Shape):
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+    3MF package writer for mesh based implementations
+
+    Each part becomes one build item. Parts whose meshes only differ by a translation
+    share one object resource, placed by the item transform.
+"""
+
+from __future__ import annotations
+from typing import IO
+from xml.sax.saxutils import quoteattr
+import zipfile
+
+import numpy as np
+
+from b13d.api.mesh import MeshPart, mesh_key
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>
+</Types>
+"""
+
+RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>
+</Relationships>
+"""
+
+MODEL_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+<resources>
+"""
+
+# vertices and triangles formatted per write
+XML_CHUNK = 1 << 14
+
+def _write_rows(stream: IO[bytes], fmt: str, rows: np.ndarray) -> None:
+    """ write one formatted line per row, XML_CHUNK rows at a time """
+    for start in range(0, len(rows), XML_CHUNK):
+        chunk = rows[start : start + XML_CHUNK]
+        stream.write(((fmt * len(chunk)) % tuple(chunk.ravel().tolist())).encode())
+
+
+def write_3mf(path: str, parts: list[MeshPart]) -> None:
+    """
+    Write (name, vertices, faces, rgb color or None) parts as one 3MF package,
+    streaming the model into the deflated zip container.
+    """
+    colors = sorted({p[3] for p in parts if p[3] is not None})
+    color_index = {c: i for i, c in enumerate(colors)}
+
+    # object resources, identical meshes up to a translation are stored once
+    objects: dict[str, int] = {}
+    items: list[tuple[int, np.ndarray]] = []
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("_rels/.rels", RELS)
+        with zf.open("3D/3dmodel.model", "w", force_zip64=True) as model:
+            model.write(MODEL_HEADER.encode())
+            if colors:
+                model.write(b'<basematerials id="1">\n')
+                for c in colors:
+                    hexcolor = f"#{c[0]:02X}{c[1]:02X}{c[2]:02X}"
+                    model.write(f'<base name="{hexcolor}" displaycolor="{hexcolor}"/>\n'.encode())
+                model.write(b"</basematerials>\n")
+
+            for name, vertices, faces, color in parts:
+                vertices = np.asarray(vertices, dtype=float)[:, :3]
+                faces = np.asarray(faces)
+                offset = vertices.min(axis=0) if len(vertices) > 0 else np.zeros(3)
+                local = vertices - offset
+                key = mesh_key(local, faces) + str(color)
+                if key not in objects:
+                    objects[key] = len(objects) + 2
+                    material = ""
+                    if color is not None:
+                        material = f' pid="1" pindex="{color_index[color]}"'
+                    model.write(
+                        f'<object id="{objects[key]}" type="model" name={quoteattr(name or "")}{material}>\n'
+                        "<mesh>\n<vertices>\n".encode()
+                    )
+                    _write_rows(model, '<vertex x="%.7g" y="%.7g" z="%.7g"/>\n', local)
+                    model.write(b"</vertices>\n<triangles>\n")
+                    _write_rows(model, '<triangle v1="%d" v2="%d" v3="%d"/>\n', faces)
+                    model.write(b"</triangles>\n</mesh>\n</object>\n")
+                items.append((objects[key], offset))
+
+            model.write(b"</resources>\n<build>\n")
+            for objectid, (x, y, z) in items:
+                model.write(
+                    f'<item objectid="{objectid}" transform="1 0 0 0 1 0 0 0 1 {x:.9g} {y:.9g} {z:.9g}"/>\n'.encode()
+                )
+            model.write(b"</build>\n</model>\n")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 import copy
 from math import pi, cos, sin, ceil
+from manifold3d import Error, Manifold, Mesh64
 from nptyping import NDArray
 import numpy as np
 import os
@@ -15,6 +16,8 @@ from typing import Union
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, test_api, Implementation
+from b13d.api.mesh import ellipsoid_sector_mesh, rounded_rod_profile, write_stl_binary
+from b13d.api.shape2d import ShapelyShape2D
 from b13d.api.utils import (
     dimXY,
     ensureClosed2DPath,
@@ -45,7 +48,13 @@ class TMShapeAPI(ShapeAPI):
     )
 
     def export(self, shape: Shape, path: Union[str, Path],fmt=".stl") -> None:
-        assert fmt in [".stl",".glb"]
+        assert fmt in [".stl",".glb",".npz"]
+        if fmt == ".npz":
+            shape.save_mesh(path)
+            return
+        if fmt == ".stl":
+            write_stl_binary(file_ensure_extension(path, fmt), shape.solid.vertices, shape.solid.faces)
+            return
         shape.solid.export(file_ensure_extension(path, fmt))
 
     def export_best(self, shape: TMShape, path: Union[str, Path]) -> None:
@@ -73,14 +82,41 @@ class TMShapeAPI(ShapeAPI):
         # Export the assembly to a GLB file
         scene.export(file_ensure_extension(path, ".glb"))
 
+    def _shape2d(self) -> type[TMShape2D]:
+        return TMShape2D
+
     def sphere(self, r: float) -> TMShape:
         return TMBall(r, self)
 
+    def ellipsoid_sector(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+    ) -> TMShape:
+        return TMEllipsoidSector(rx, ry, rz, self)
+
+    def torus(self, r_major: float, r_minor: float) -> TMShape:
+        return TMTorus(r_major, r_minor, self)
+
+    def instances(self, shape: TMShape, transforms: list[tuple[float, ...]]) -> TMShape:
+        shape.ensureVolume()
+        meshes = []
+        for t in transforms:
+            mat = np.diag([*(t[3:] if len(t) > 3 else (1, 1, 1)), 1.0])
+            mat[:3, 3] = t[:3]
+            meshes.append(shape.solid.copy().apply_transform(mat))
+        placed = copy.copy(shape)
+        placed.solid = tm.util.concatenate(meshes)
+        # disjoint copies of a valid volume
+        placed.valid_volume = True
+        return placed
+
     def box(self, l: float, wth: float, ht: float, center: bool = True) -> TMShape:
         retval = TMBox(l, wth, ht, self)
         if center:
             return retval    
-        return retval.mv(-l / 2, -wth / 2, -ht / 2)        
+        return retval.mv(l / 2, wth / 2, ht / 2)
 
     def cone_x(self, h: float, r1: float, r2: float) -> TMShape:
         return TMCone(h, r1, r2, None, self.rotZtoX, self)
@@ -109,6 +145,9 @@ class TMShapeAPI(ShapeAPI):
     def cylinder_z(self, l: float, rad: float) -> TMShape:
         return TMRod(l, rad, None, None, self)
 
+    def cylinder_rounded_z(self, l: float, rad: float, domeRatio: float = 1) -> TMShape:
+        return TMRndRodZ(l, rad, domeRatio, self)
+
     def polygon_extrusion(self, path: list[tuple[float, float]], ht: float) -> TMShape:
         return TMPolyExtrusionZ(path, ht, self)
 
@@ -145,17 +184,56 @@ class TMShapeAPI(ShapeAPI):
     def genImport(self, infile: str, extrude: float = None) -> TMShape:
         return TMImport(infile, extrude=extrude)
 
+    def mesh_shape(self, vertices, faces) -> TMShape:
+        shape = TMShape(self)
+        shape.solid = tm.Trimesh(vertices=vertices, faces=faces, process=False)
+        shape.valid_volume = True
+        return shape
+
 class TMShape(Shape):
 
     X_AXIS = (1, 0, 0)
     Y_AXIS = (0, 1, 0)
     Z_AXIS = (0, 0, 1)
 
+    # True once the mesh is known to be a valid volume, so that booleans
+    # do not have to re-check (and re-repair) meshes they produced themselves
+    valid_volume: bool = False
+
+    # True while the mesh may be shared with a dup(), copy it before any in place change
+    shared: bool = False
+
     def __init__(self, api: TMShapeAPI = TMShapeAPI(implementation=Implementation.TRIMESH)):
         super().__init__(api)
         self.solid: tm.Trimesh = None
 
+    @property
+    def solid(self) -> tm.Trimesh:
+        return self._solid
+
+    @solid.setter
+    def solid(self, mesh: tm.Trimesh) -> None:
+        # in place transforms hand back the same mesh and keep it a volume,
+        # any other mesh has to be checked again before the next boolean
+        if mesh is not getattr(self, "_solid", None):
+            self.valid_volume = False
+            self.shared = False
+        self._solid = mesh
+
+    def _own(self) -> tm.Trimesh:
+        """ copy on write: make sure the mesh is not shared before changing it in place """
+        if self.shared:
+            self._solid = self._solid.copy()
+            self.shared = False
+        return self._solid
+
     def ensureVolume(self) -> None:
+        if self.valid_volume:
+            return
+        self._ensureVolume()
+        self.valid_volume = True
+
+    def _ensureVolume(self) -> None:
         if self.solid.is_volume:
             return
         else:
@@ -163,6 +241,7 @@ class TMShape(Shape):
                 "warning: solid is NOT a valid volume, attempt minor repair...",
                 file=sys.stderr,
             )
+            self._own()
             jctol = self.api.implementation.tolerance()
             self.solid.update_faces(self.solid.nondegenerate_faces(jctol / 2))
             self.solid.update_faces(self.solid.unique_faces())
@@ -191,28 +270,34 @@ class TMShape(Shape):
             self.solid = self.solid.convex_hull
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.segments(dim)
 
     def cut(self, cutter: TMShape) -> TMShape:
         if cutter is None or cutter.solid is None:
             return self
-        self.ensureVolume()
-        cutter.ensureVolume()
-        self.solid = tm.boolean.difference([self.solid, cutter.solid])
-        return self
+        return self._boolean("difference", cutter)
 
     def intersection(self, intersector: TMShape) -> TMShape:
         if intersector is None or intersector.solid is None:
             return self
+        return self._boolean("intersection", intersector)
+
+    def _boolean(self, operation: str, other: TMShape) -> TMShape:
         self.ensureVolume()
-        intersector.ensureVolume()
-        self.solid = tm.boolean.intersection([self.solid, intersector.solid])
+        other.ensureVolume()
+        # operands are known volumes, no need for trimesh to check them again
+        self.solid = tm.boolean.boolean_manifold(
+            [self.solid, other.solid], operation=operation, check_volume=False
+        )
+        # manifold results are valid volumes even when trimesh's stricter
+        # is_volume disagrees, e.g. on shapes touching along an edge
+        self.valid_volume = True
         return self
 
     def dup(self) -> TMShape:
-        duplicate = copy.copy(self)
-        duplicate.solid = self.solid.copy()
-        return duplicate
+        # share the mesh, whichever side changes it in place first makes its own copy
+        self.shared = True
+        return copy.copy(self)
 
     def fillet(
         self,
@@ -265,34 +350,77 @@ class TMShape(Shape):
 
     def hull(self):
         self.solid = self.solid.convex_hull
+        self.valid_volume = True
         return self
 
+    def decimate(self, tolerance: float) -> TMShape:
+        # manifold simplification keeps the mesh watertight
+        # double precision meshes, vertices are not rounded to float32
+        mesh = Mesh64(
+            vert_properties=np.asarray(self.solid.vertices, dtype=np.float64),
+            tri_verts=np.asarray(self.solid.faces, dtype=np.uint64),
+        )
+        manifold = Manifold(mesh)
+        if manifold.status() != Error.NoError:
+            print(f"Trimesh: cannot decimate non manifold mesh: {manifold.status()}", file=sys.stderr)
+            return self
+        simplified = manifold.simplify(tolerance)
+        if simplified.num_tri() == len(self.solid.faces):
+            # nothing simplified, keep the mesh as is
+            return self
+        simplified = simplified.to_mesh64()
+        self.solid = tm.Trimesh(
+            vertices=simplified.vert_properties[:, :3], faces=simplified.tri_verts
+        )
+        self.valid_volume = True
+        # the rebuilt mesh has default face colors
+        return self.set_color()
+
+    def num_tri(self) -> int:
+        return len(self.solid.faces)
+
+    def mesh_stats(self) -> tuple[int, float]:
+        return len(self.solid.faces), self.solid.area
+
+    def metrics(self, hull: bool = False) -> dict:
+        extents = self.solid.extents
+        rpt = {
+            "volume": self.solid.volume,
+            "bounding_box_x": extents[0],
+            "bounding_box_y": extents[1],
+            "bounding_box_z": extents[2],
+            "triangle_count": len(self.solid.faces),
+        }
+        if hull:
+            rpt["convex_hull_volume"] = self.solid.convex_hull.volume
+        return rpt
+
+    def to_mesh(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.solid.vertices, self.solid.faces
+
     def join(self, joiner: TMShape) -> TMShape:
         if joiner is None or joiner.solid is None:
             return self
-
-        self.ensureVolume()
-        joiner.ensureVolume()
-        self.solid = tm.boolean.union([self.solid, joiner.solid])
-        return self
+        return self._boolean("union", joiner)
 
     def mirror(self) -> TMShape:
         dup = copy.copy(self)
         reflectXZ = tm.transformations.reflection_matrix([0, 0, 0], [0, 1, 0])
         dup.solid = self.solid.copy().apply_transform(reflectXZ)
+        dup.valid_volume = self.valid_volume
         return dup
 
     def mv(self, x: float, y: float, z: float) -> TMShape:
         if x == 0 and y == 0 and z == 0:
             return self
-        self.solid = self.solid.apply_translation((x, y, z))
+        self.solid = self._own().apply_translation((x, y, z))
         return self
 
     def _rotate(self, ang: float, dir: tuple[float, float, float]) -> TMShape:
         if ang == 0:
             return self
         rotMat = tm.transformations.rotation_matrix(angle=radians(ang), direction=dir)
-        self.solid = self.solid.apply_transform(rotMat)
+        self.solid = self._own().apply_transform(rotMat)
         return self
 
     def rotate_x(self, ang: float) -> TMShape:
@@ -307,7 +435,7 @@ class TMShape(Shape):
     def scale(self, x: float, y: float, z: float) -> TMShape:
         if x == 1 and y == 1 and z == 1:
             return self
-        self.solid = self.solid.apply_scale((x, y, z))
+        self.solid = self._own().apply_scale((x, y, z))
         return self
 
     def set_color(self, rgb: tuple[int, int, int] = None) -> Shape:
@@ -316,9 +444,21 @@ class TMShape(Shape):
         if not self.color is None:
             c = self.color.value
             face_colors = (c[0], c[1], c[2], 255)
-            self.solid.visual.face_colors = face_colors
+            self._own().visual.face_colors = face_colors
         return self
 
+class TMShape2D(ShapelyShape2D):
+    def extrude(self, ht: float) -> TMShape:
+        shape = TMShape(self.api)
+        shape.solid = tm.util.concatenate(
+            [tm.creation.extrude_polygon(p, abs(ht)) for p in self.polygons()]
+        )
+        shape.valid_volume = True
+        if ht < 0:
+            shape.mv(0, 0, ht)
+        return shape
+
+
 class TMBall(TMShape):
     def __init__(self, rad: float, api: TMShapeAPI):
         super().__init__(api)
@@ -326,6 +466,34 @@ class TMBall(TMShape):
         self.solid = tm.creation.uv_sphere(
             radius=rad, count=(segs, segs), validate=True
         )
+        self.valid_volume = True
+
+
+class TMEllipsoidSector(TMShape):
+    def __init__(
+        self,
+        rx: tuple[float, float],
+        ry: tuple[float, float],
+        rz: tuple[float, float],
+        api: TMShapeAPI,
+    ):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * max(*rx, *ry, *rz))
+        verts, faces = ellipsoid_sector_mesh(rx, ry, rz, segs)
+        self.solid = tm.Trimesh(vertices=verts, faces=faces)
+        self.valid_volume = True
+
+
+class TMTorus(TMShape):
+    def __init__(self, r_major: float, r_minor: float, api: TMShapeAPI):
+        super().__init__(api)
+        self.solid = tm.creation.torus(
+            major_radius=r_major,
+            minor_radius=r_minor,
+            major_sections=self._smoothing_segments(2 * pi * (r_major + r_minor)),
+            minor_sections=self._smoothing_segments(2 * pi * r_minor),
+        )
+        self.valid_volume = True
 
 
 class TMBox(TMShape):
@@ -335,6 +503,7 @@ class TMBox(TMShape):
         self.wth = wth
         self.ht = ht
         self.solid = tm.creation.box(extents=(l, wth, ht), validate=True)
+        self.valid_volume = True
 
 
 class TMCone(TMShape):
@@ -353,6 +522,7 @@ class TMCone(TMShape):
         self.solid = tm.creation.revolve(
             linestring=linestring, sections=sects, transform=rotMat, validate=True
         )
+        self.valid_volume = True
 
 
 class TMPolyExtrusionZ(TMShape):
@@ -375,6 +545,17 @@ class TMRod(TMShape):
         self.solid = tm.creation.cylinder(
             radius=rad, height=l, sections=segs, transform=rotMat, validate=True
         )
+        self.valid_volume = True
+
+
+class TMRndRodZ(TMShape):
+    def __init__(self, l: float, rad: float, domeRatio: float, api: TMShapeAPI):
+        super().__init__(api)
+        segs = self._smoothing_segments(2 * pi * rad)
+        # revolve wants the profile from bottom to top for outward facing normals
+        profile = rounded_rod_profile(l, rad, domeRatio, segs)[::-1]
+        self.solid = tm.creation.revolve(linestring=profile, sections=segs)
+        self.valid_volume = True
 
 
 # draw mix of straight lines from pt to pt, or draw spline with [(x,y,dx,dy), ...], then extrude on Z-axis
@@ -461,6 +642,7 @@ class TMLineSplineRevolveX(TMShape):
 
             self.ensureVolume()
             self.solid = tm.boolean.difference([self.solid, cut])
+            self.valid_volume = True
 
         self.rotate_z(90).rotate_y(90)
 
@@ -488,6 +670,7 @@ class TMCirclePolySweep(TMShape):
         segs = self._smoothing_segments(2 * pi * rad)
         polygon = Polygon(circle_polygon_points(segs, rad))
         self.solid = tm.creation.sweep_polygon(polygon, path, validate=True)
+        self.valid_volume = True
 
 
 class TMTextZ(TMShape):
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+    Opt-in tracing of Shape and ShapeAPI operations
+
+    While a Tracer is active, every traced operation records its wall time, the part
+    being generated, the triangle counts of its input and output shapes and the change
+    of resident memory, saved as a Chrome trace (chrome://tracing, ui.perfetto.dev).
+"""
+
+from __future__ import annotations
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+# Shape operations traced, as implemented or inherited by each implementation
+TRACED_SHAPE_OPS = (
+    "cut", "join", "intersection", "dup", "mirror", "mirror_and_join", "half",
+    "mv", "rotate", "rotate_x", "rotate_y", "rotate_z", "scale",
+    "hull", "fillet", "decimate",
+)
+
+# ShapeAPI constructors and exports traced
+TRACED_API_OPS = (
+    "sphere", "box", "torus", "ellipsoid_sector", "instances",
+    "cone_x", "cone_y", "cone_z",
+    "cylinder_x", "cylinder_y", "cylinder_z",
+    "cylinder_rounded_x", "cylinder_rounded_y", "cylinder_rounded_z",
+    "regpoly_extrusion_x", "regpoly_extrusion_y", "regpoly_extrusion_z",
+    "polygon_extrusion", "spline_extrusion", "spline_revolve", "regpoly_sweep",
+    "text", "genImport",
+    "export", "export_stl", "export_best", "export_3mf", "export_glb", "export_levels",
+)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """ resident memory of this process, peak resident memory where /proc is unavailable """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+class Tracer:
+    """ Collects the events of traced operations while active """
+
+    def __init__(self, part: Callable[[], str] = None):
+        # name of the part an operation belongs to
+        self.part = part
+        self.events: list[dict] = []
+        # thread names by id, part stream threads are gone when saving
+        self.threads: dict[int, str] = {}
+        self._t0 = time.perf_counter()
+
+    def __enter__(self) -> Tracer:
+        _TRACERS.append(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _TRACERS.remove(self)
+
+    def record(self, name: str, cat: str, start: float, end: float, args: dict) -> None:
+        if self.part is not None:
+            args["part"] = self.part()
+        thread = threading.current_thread()
+        self.threads[thread.ident] = thread.name
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - self._t0) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def save(self, path: str) -> str:
+        """ write the Chrome trace json """
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in self.threads.items()
+        ]
+        with open(path, "w", encoding="UTF8") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+
+# active tracers, innermost last
+_TRACERS: list[Tracer] = []
+
+
+def _evaluated_triangles(shape) -> int:
+    """
+    triangle count of a shape already evaluated by a traced operation, None otherwise.
+    Lazy implementations (manifold) evaluate on counting, which would charge
+    the pending work of earlier operations to this one.
+    """
+    counted = getattr(shape, "_traced_tri", None)
+    if counted is None or counted[0] is not getattr(shape, "solid", None):
+        return None
+    return counted[1]
+
+
+def _count_triangles(shape) -> int:
+    """ triangle count of a shape, forcing its evaluation """
+    count = shape.num_tri()
+    if count is not None:
+        shape._traced_tri = (getattr(shape, "solid", None), count)
+    return count
+
+
+def trace_op(fn: Callable, cat: str) -> Callable:
+    """ wrap a Shape or ShapeAPI operation to record it in the active tracer """
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not _TRACERS:
+            return fn(self, *args, **kwargs)
+        tracer = _TRACERS[-1]
+        event = {"implementation": str(getattr(self, "implementation", None) or self.api.implementation)}
+        if cat == "shape":
+            event["triangles_in"] = _evaluated_triangles(self)
+        rss = rss_bytes()
+        start = time.perf_counter()
+        result = fn(self, *args, **kwargs)
+        if result is not None and hasattr(result, "num_tri"):
+            # inside the timed window, lazy implementations evaluate here
+            event["triangles_out"] = _count_triangles(result)
+        end = time.perf_counter()
+        event["memory_delta"] = rss_bytes() - rss
+        tracer.record(fn.__name__, cat, start, end, event)
+        return result
+
+    wrapper.traced = True
+    return wrapper
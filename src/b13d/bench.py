@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""
+    Benchmark of solid builds across configurations, implementations and fidelities
+
+    Each build of the matrix runs several times in a fresh process, recording the
+    median and 95th percentile wall time, the peak resident memory, the triangle count
+    and the size of the output files. Results can be saved as a baseline, later runs
+    are compared against it and fail when a metric regresses beyond its threshold.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from prettytable import PrettyTable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../"))
+
+from b13d.api.core import Fidelity, Implementation
+
+DEFAULT_PARTS = ["pylele.pylele2.all_assembly"]
+DEFAULT_CONFIGURATIONS = ["default"]
+DEFAULT_APIS = [Implementation.MANIFOLD, Implementation.TRIMESH]
+DEFAULT_FIDELITIES = [Fidelity.LOW]
+DEFAULT_REPEAT = 3
+
+# largest relative increase of each metric over the baseline
+DEFAULT_THRESHOLDS = {
+    "time_median": 0.25,
+    "time_p95": 0.5,
+    "peak_rss": 0.2,
+    "triangle_count": 0.05,
+    "output_size": 0.1,
+}
+BENCH_METRICS = list(DEFAULT_THRESHOLDS.keys())
+
+def threshold_arg(arg: str) -> tuple[str, float]:
+    """Parse a METRIC=RATIO regression threshold"""
+    metric, _, ratio = arg.partition("=")
+    if metric not in DEFAULT_THRESHOLDS:
+        raise argparse.ArgumentTypeError(f"metric {metric} not in {BENCH_METRICS}")
+    return metric, float(ratio)
+
+def bench_parser(parser=None):
+    """
+    b13d-bench Command Line Interface
+    """
+    if parser is None:
+        parser = argparse.ArgumentParser(description="b13d build benchmark")
+
+    parser.add_argument("-p", "--parts", help="Modules of the solids to build",
+                        nargs="+", type=str, default=DEFAULT_PARTS)
+    parser.add_argument("-cfg", "--configurations", help="Configurations to build each part with",
+                        nargs="+", type=str, default=DEFAULT_CONFIGURATIONS)
+    parser.add_argument("-i", "--implementations", help="Implementations to build with",
+                        nargs="+", type=Implementation, choices=list(Implementation),
+                        default=DEFAULT_APIS)
+    parser.add_argument("-f", "--fidelities", help="Fidelities to build at",
+                        nargs="+", type=Fidelity, choices=list(Fidelity),
+                        default=DEFAULT_FIDELITIES)
+    parser.add_argument("-r", "--repeat", help="Builds per matrix entry",
+                        type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("-o", "--output", help="Save the results as json",
+                        type=str, default=None)
+    parser.add_argument("-b", "--baseline", help="Compare the results with this saved baseline",
+                        type=str, default=None)
+    parser.add_argument("-t", "--thresholds",
+                        help=f"Regression thresholds as METRIC=RATIO, defaults {DEFAULT_THRESHOLDS}",
+                        nargs="+", type=threshold_arg, default=[])
+    return parser
+
+def bench_key(part: str, cfg: str, api: Implementation, fidelity: Fidelity) -> str:
+    """Identifier of a matrix entry"""
+    return f"{part}:{cfg}:{api}:{fidelity}"
+
+def run_build(part: str, cfg: str, api: Implementation, fidelity: Fidelity) -> dict:
+    """Build once in a fresh process, returns wall time, peak rss, triangle count and output size"""
+    with tempfile.TemporaryDirectory() as outdir:
+        cmd = [sys.executable, "-m", part,
+               "-i", str(api), "-f", str(fidelity),
+               "-o", outdir, "-odoff", "-stlc", "-rw"]
+        if cfg != "default":
+            cmd += ["-cfg", cfg]
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(
+            [os.path.join(os.path.dirname(__file__), "../"), env.get("PYTHONPATH", "")]
+        )
+
+        with open(os.path.join(outdir, "bench.log"), "w+", encoding="UTF8") as log:
+            start = time.perf_counter()
+            proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=log)
+            if hasattr(os, "wait4"):
+                # resource usage of this child only
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                # kilobytes on linux, bytes on macos
+                peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+            else:
+                proc.wait()
+                peak_rss = None
+            wall = time.perf_counter() - start
+            log.seek(0)
+            assert proc.returncode == 0, f"ERROR: {' '.join(cmd)} failed!\n{log.read()}"
+
+        # summed over the reports of every exported part
+        triangles = None
+        for rpt_fname in glob.glob(os.path.join(outdir, "*", "*_rpt.json")):
+            with open(rpt_fname, encoding="UTF8") as f:
+                count = json.load(f).get("triangle_count")
+            if count is not None:
+                triangles = (triangles or 0) + count
+        size = sum(
+            os.path.getsize(fname)
+            for fname in glob.glob(os.path.join(outdir, "*", "*"))
+            if os.path.splitext(fname)[1] not in (".json", ".txt")
+        )
+    return {"time": wall, "peak_rss": peak_rss, "triangle_count": triangles, "output_size": size}
+
+def run_bench(
+    parts: list[str] = DEFAULT_PARTS,
+    configurations: list[str] = DEFAULT_CONFIGURATIONS,
+    implementations: list[Implementation] = DEFAULT_APIS,
+    fidelities: list[Fidelity] = DEFAULT_FIDELITIES,
+    repeat: int = DEFAULT_REPEAT,
+) -> dict:
+    """Run the benchmark matrix, returns the metrics of each entry"""
+    results = {}
+    for part in parts:
+        for cfg in configurations:
+            for api in implementations:
+                for fidelity in fidelities:
+                    key = bench_key(part, cfg, api, fidelity)
+                    print(f"# Bench {key}")
+                    runs = [run_build(part, cfg, api, fidelity) for _ in range(repeat)]
+                    times = [r["time"] for r in runs]
+                    rss = [r["peak_rss"] for r in runs if r["peak_rss"] is not None]
+                    results[key] = {
+                        "time_median": float(np.median(times)),
+                        "time_p95": float(np.percentile(times, 95)),
+                        "peak_rss": max(rss) if rss else None,
+                        "triangle_count": runs[-1]["triangle_count"],
+                        "output_size": runs[-1]["output_size"],
+                        "repeat": repeat,
+                    }
+    return results
+
+def compare_baseline(results: dict, baseline: dict, thresholds: dict = None) -> list[str]:
+    """Regressions of results over the baseline, beyond the relative thresholds"""
+    thresholds = DEFAULT_THRESHOLDS | (thresholds or {})
+    regressions = []
+    for key, metrics in results.items():
+        if key not in baseline:
+            print(f"# WARNING: {key} not in baseline")
+            continue
+        for metric, ratio in thresholds.items():
+            new, old = metrics.get(metric), baseline[key].get(metric)
+            if new is None or old is None:
+                continue
+            if new > old * (1 + ratio):
+                regressions.append(f"{key} {metric}: {old} -> {new} (+{100 * (new / old - 1):.1f}% > {100 * ratio:.0f}%)")
+    return regressions
+
+def print_bench(results: dict, baseline: dict = None) -> None:
+    """Print the results, with the baseline values when available"""
+    table = PrettyTable(["entry"] + BENCH_METRICS)
+    for key, metrics in results.items():
+        row = [key]
+        for metric in BENCH_METRICS:
+            value = metrics.get(metric)
+            cell = "-" if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+            if baseline is not None and baseline.get(key, {}).get(metric) is not None:
+                cell += f" ({baseline[key][metric]:.6g})"
+            row.append(cell)
+        table.add_row(row)
+    print(table)
+
+def bench_main(args=None) -> int:
+    """Run the benchmark, save it and gate it against a baseline"""
+    cli = bench_parser().parse_args(args=args)
+    results = run_bench(
+        parts=cli.parts,
+        configurations=cli.configurations,
+        implementations=cli.implementations,
+        fidelities=cli.fidelities,
+        repeat=cli.repeat,
+    )
+
+    baseline = None
+    if cli.baseline is not None:
+        with open(cli.baseline, encoding="UTF8") as f:
+            baseline = json.load(f)
+    print_bench(results, baseline)
+
+    if cli.output is not None:
+        with open(cli.output, "w", encoding="UTF8") as f:
+            json.dump(results, f, indent=4)
+        print(f"Results: {cli.output}")
+
+    if baseline is not None:
+        regressions = compare_baseline(results, baseline, dict(cli.thresholds))
+        for r in regressions:
+            print(f"## REGRESSION: {r}")
+        if regressions:
+            return 1
+    return 0
+
+def main():
+    """b13d-bench entry point"""
+    sys.exit(bench_main())
+
+def test_bench(self):
+    """Test Bench"""
+    results = run_bench(
+        parts=["b13d.parts.tube"],
+        implementations=[Implementation.MOCK],
+        repeat=1,
+    )
+    self.assertEqual(compare_baseline(results, results), [])
+
+if __name__ == "__main__":
+    main()
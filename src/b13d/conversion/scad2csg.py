@@ -4,34 +4,43 @@
 
 import sys
 import os
-import time
+import shlex
+import subprocess
+import tempfile
 
 OPENSCAD='openscad'
+# seconds before a conversion is abandoned
+SCAD2CSG_TIMEOUT = 600
 
-def scad2csg(infile, command=OPENSCAD) -> str:
-    """ Converts a .scad mesh into a .csg """
+def scad2csg(infile, command=OPENSCAD, outfile='', timeout=SCAD2CSG_TIMEOUT) -> str:
+    """ Converts a .scad mesh into a .csg, next to the input unless outfile is given """
     assert os.path.isfile(infile), f'File {infile} does not exist!!!'
 
-    inpath, baseinfile = os.path.split(infile)
+    inpath, baseinfile = os.path.split(os.path.abspath(infile))
     fname, fext = os.path.splitext(baseinfile)
     assert fext=='.scad'
-    # for whatever reason openscad does not like to export .csg on a different directory
-    fout = fname+'.csg'
-
-    cmdstr = f'{command} -o {fout} {infile}'
-    print(cmdstr)
-    os.system(cmdstr)
-
-    time.sleep(0.1) # wait for file to appear
-    assert os.path.isfile(fout), f'ERROR: file {fout} does not exist!'
-
-    # mv output file to input directory
-    cmdstr = f'mv {fout} {inpath}'
-    os.system(cmdstr)
-    outfname = os.path.join(inpath,fout)
-    assert os.path.isfile(outfname), f'ERROR: file {outfname} does not exist!'
-
-    return outfname
+    if outfile=='':
+        outfile = os.path.join(inpath, fname+'.csg')
+    outfile = os.path.abspath(outfile)
+
+    # for whatever reason openscad does not like to export .csg on a different directory,
+    # so it writes a name unique to this conversion in the input directory, moved to outfile
+    fd, tmpfile = tempfile.mkstemp(suffix='.csg', prefix=fname+'.', dir=inpath)
+    os.close(fd)
+    cmd = shlex.split(command) + ['-o', os.path.basename(tmpfile), baseinfile]
+    print(' '.join(cmd))
+    try:
+        proc = subprocess.run(
+            cmd, cwd=inpath, capture_output=True, text=True, timeout=timeout, check=False
+        )
+        assert proc.returncode == 0, f'ERROR: {command} failed on {infile}!\n{proc.stderr}'
+        os.replace(tmpfile, outfile)
+    finally:
+        if os.path.isfile(tmpfile):
+            os.remove(tmpfile)
+    assert os.path.isfile(outfile), f'ERROR: file {outfile} does not exist!'
+
+    return outfile
 
 if __name__ == '__main__':
     scad2csg(sys.argv[1])
@@ -2,18 +2,50 @@
 
 """
 Converts a .stl file from ascii to binary format
-Uses stl2bin tool included with numpy-stl
+The ascii file is parsed in blocks and written in chunks of binary records,
+so memory stays bounded for any file size
 """
 
 import sys
 import os
 
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from b13d.api.mesh import STL_DTYPE, STL_HEADER_DTYPE, triangle_normals
+
+# bytes of ascii text parsed at a time
+STL_ASCII_BLOCK = 1 << 22
+
 def stl_is_bin(fname) -> bool:
-    """ Returns True if .stl in ascii format """
-    with open(fname, "r",encoding='utf-8') as fp:
-        retval=fp.readline().find("solid") > -1
-        fp.close()
-    return retval
+    """ Returns True if .stl in binary format """
+    size = os.path.getsize(fname)
+    with open(fname, "rb") as fp:
+        head = fp.read(STL_HEADER_DTYPE.itemsize)
+    if len(head) == STL_HEADER_DTYPE.itemsize:
+        count = int(np.frombuffer(head, dtype=STL_HEADER_DTYPE)[0]["face_count"])
+        if size == STL_HEADER_DTYPE.itemsize + count * STL_DTYPE.itemsize:
+            return True
+    # binary headers may also start with "solid"
+    return not head.lstrip().startswith(b"solid")
+
+def stl_ascii_vertices(fp, block: int = STL_ASCII_BLOCK):
+    """ Yields (n, 3) float32 vertex coordinates of an ascii .stl, one text block at a time """
+    tail = b""
+    while True:
+        data = fp.read(block)
+        text = tail + data
+        if data:
+            # only parse complete lines
+            cut = text.rfind(b"\n") + 1
+            text, tail = text[:cut], text[cut:]
+        tokens = np.array(text.split())
+        idx = np.flatnonzero(tokens == b"vertex")
+        if len(idx) > 0:
+            yield tokens[idx[:, None] + np.arange(1, 4)].astype("<f4")
+        if not data:
+            return
 
 def stlascii2stlbin(infile,outfile='') -> str:
     """ Converts an ASCII .stl into a binary """
@@ -24,8 +56,28 @@ def stlascii2stlbin(infile,outfile='') -> str:
             fname,fext = os.path.splitext(infile)
             outfile = f'{fname}_bin{fext}'
 
-        cmdstr = f'stl2bin {infile} {outfile}'
-        os.system(cmdstr)
+        header = np.zeros(1, dtype=STL_HEADER_DTYPE)
+        count = 0
+        rest = np.zeros((0, 3), dtype="<f4")
+        with open(infile, "rb") as fin, open(outfile, "wb") as fout:
+            header.tofile(fout)
+            for verts in stl_ascii_vertices(fin):
+                # triangles may straddle two blocks
+                verts = np.concatenate([rest, verts])
+                n = len(verts) // 3
+                rest = verts[3 * n:]
+                tris = verts[: 3 * n].reshape(n, 3, 3)
+                records = np.zeros(n, dtype=STL_DTYPE)
+                records["vertices"] = tris
+                records["normals"] = triangle_normals(tris)
+                records.tofile(fout)
+                count += n
+            assert len(rest) == 0, f"ERROR: .stl {infile} has an incomplete triangle!"
+            # the face count is only known at the end
+            header["face_count"] = count
+            fout.seek(0)
+            header.tofile(fout)
+
         assert os.path.isfile(outfile), f"ERROR: Output File {outfile} does not exist!"
         return outfile
     else:
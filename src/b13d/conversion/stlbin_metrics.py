@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Volume, extents and triangle count of a binary .stl file,
+computed in chunks straight from the memory mapped triangle records
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from b13d.api.mesh import STL_CHUNK_FACES, STL_DTYPE, STL_HEADER_DTYPE
+
+def stl_memmap(fname) -> np.memmap:
+    """ Memory map the triangle records of a binary .stl, None if the file is not binary """
+    size = os.path.getsize(fname)
+    if size < STL_HEADER_DTYPE.itemsize:
+        return None
+    header = np.fromfile(fname, dtype=STL_HEADER_DTYPE, count=1)[0]
+    count = int(header["face_count"])
+    if size != STL_HEADER_DTYPE.itemsize + count * STL_DTYPE.itemsize:
+        # ascii files do not match the record layout
+        return None
+    if count == 0:
+        return np.zeros(0, dtype=STL_DTYPE)
+    return np.memmap(
+        fname, dtype=STL_DTYPE, mode="r", offset=STL_HEADER_DTYPE.itemsize, shape=(count,)
+    )
+
+def stl_bin_metrics(fname, hull: bool = False, chunk_faces: int = STL_CHUNK_FACES) -> dict:
+    """ Report metrics of a binary .stl, None if the file is not binary """
+    records = stl_memmap(fname)
+    if records is None:
+        return None
+
+    volume = 0.0
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    hull_pts = np.zeros((0, 3))
+    for start in range(0, len(records), chunk_faces):
+        tris = np.asarray(records["vertices"][start : start + chunk_faces], dtype=np.float64)
+        # signed volume of the tetrahedra from the origin to each triangle
+        volume += np.einsum("ij,ij->", tris[:, 0], np.cross(tris[:, 1], tris[:, 2])) / 6
+        pts = tris.reshape(-1, 3)
+        lo = np.minimum(lo, pts.min(axis=0))
+        hi = np.maximum(hi, pts.max(axis=0))
+        if hull:
+            # only the hull vertices of each chunk can be on the final hull
+            hull_pts = _hull_vertices(np.vstack([hull_pts, pts]))
+
+    extents = hi - lo if len(records) > 0 else np.zeros(3)
+    rpt = {
+        "volume": volume,
+        "bounding_box_x": extents[0],
+        "bounding_box_y": extents[1],
+        "bounding_box_z": extents[2],
+        "triangle_count": len(records),
+    }
+    if hull:
+        rpt["convex_hull_volume"] = _hull_volume(hull_pts)
+    return rpt
+
+def _hull_vertices(pts: np.ndarray) -> np.ndarray:
+    from scipy.spatial import ConvexHull
+    pts = np.unique(pts, axis=0)
+    if len(pts) < 4:
+        return pts
+    return pts[ConvexHull(pts).vertices]
+
+def _hull_volume(pts: np.ndarray) -> float:
+    from scipy.spatial import ConvexHull
+    if len(pts) < 4:
+        return 0.0
+    return ConvexHull(pts).volume
+
+if __name__ == '__main__':
+    print(stl_bin_metrics(sys.argv[1], hull=True))
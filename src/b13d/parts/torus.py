@@ -73,10 +73,10 @@ class Torus(Solid):
 
     def gen(self) -> Shape:
         """ generate torus """
-        if False:
-            return self.gen_sweep()
-        else:
-            return self.gen_revolve()
+        if self.cli.angles_range >= 360:
+            # full ring, axis along Y like the revolved version
+            return self.api.torus(self.cli.r2, self.cli.r1).rotate_x(90)
+        return self.gen_revolve()
 
         
 def main(args=None):
@@ -88,7 +88,7 @@ def main(args=None):
 def test_torus(self,apis=None):
     """ Test Torus """
     tests={
-         "default":["-refv","1660"],
+         "default":["-refv","1579"],
          "rev270" :["-ar", "270","-refv","1239"]
          }
     test_loop(module=__name__,tests=tests,apis=apis)
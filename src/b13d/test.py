@@ -223,6 +223,9 @@ class B13DTestMethods(unittest.TestCase):
         """Test Manifold API"""
         test_api(api=Implementation.MANIFOLD)
 
+    ## Bounding Boxes
+    from b13d.api.bbox import test_regpoly_bbox
+
     ## Solid Parts
     from b13d.parts.tube import test_tube, test_tube_mock
     from b13d.parts.screw import test_screw, test_screw_mock
@@ -232,6 +235,9 @@ class B13DTestMethods(unittest.TestCase):
     from b13d.parts.rounded_rectangle_extrusion import test_rounded_rectangle, test_rounded_rectangle_mock
     from b13d.parts.torus import test_torus, test_torus_mock
 
+    ## Benchmark
+    from b13d.bench import test_bench
+
     def test_zz_report(self):
         """ Generate Test Report """
         test_report(name=TEST_NAME_B13D)
@@ -68,16 +68,16 @@ class TunerKnob(Solid):
         r = self.cli.knob_diameter/2
         grip = None
         for i in range(self.cli.ngrip):
-            grip_hole = self.api.cylinder_z(
-                l=self.cli.knob_height + tol,
-                rad=self.cli.grip_diameter/2
-            )
+            grip_hole = self.api.circle2d(rad=self.cli.grip_diameter/2)
             # calculate position
             phi = 2*pi*i/self.cli.ngrip
             xg = r * cos( phi )
             yg = r * sin( phi )
-            grip_hole <<= (xg,yg,0)
+            grip_hole <<= (xg,yg)
             grip = grip_hole + grip
+        if grip is not None:
+            grip_ht = self.cli.knob_height + tol
+            grip = grip.extrude(grip_ht).mv(0, 0, -grip_ht/2)
 
         return knob - round_hole + hole_sides - grip
         
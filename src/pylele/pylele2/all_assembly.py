@@ -9,7 +9,8 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
-from b13d.api.core import Shape
+from b13d.api.core import Shape, supported_apis
+from b13d.api.constants import DEFAULT_TEST_DIR
 from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.base import LeleBase
 from pylele.pylele2.texts import pylele_texts_parser
@@ -23,6 +24,9 @@ from pylele.pylele2.bridge_assembly import pylele_bridge_assembly_parser
 from pylele.pylele2.strings import LeleStrings
 from pylele.pylele2.tuners import LeleTuners
 
+# [s] to wait for a background refine in tests
+REFINE_TIMEOUT = 900
+
 class LeleAllAssembly(LeleBase):
     """Pylele All Assembly Generator class"""
 
@@ -107,6 +111,15 @@ def test_all_assembly(self, apis=None):
         "separate_fretboard": ["-F"],
         "separate_all": ["-F", "-N", "-T", "-B", "-NU", "-FR", "-D", "-G"],
         "gotoh_tuners": ["-t", "gotoh"],
+        "preview_fidelity": ["-f", "preview"],
+        "part_fidelity": ["-pf", "LeleFrets=high", "LeleTexts=preview"],
+        "triangle_budget": ["-T", "-tb", "60000"],
+        "decimate": ["-T", "-dec", "-decr", "LeleTopAssembly=0.5"],
+        "export_3mf": ["-T", "-N", "-exp", ".3mf"],
+        "export_glb": ["-T", "-N", "-exp", ".glb"],
+        "archive": ["-T", "-N", "-zip", "-exp", ".3mf"],
+        "stream": ["-T", "-N", "-stm", "-stmf"],
+        "trace": ["-T", "-trc"],
     }
 
     # reference volumes
@@ -135,5 +148,33 @@ def test_all_assembly_mock(self):
     test_all_assembly(self, apis=["mock"])
 
 
+def test_all_assembly_preview(self, apis=None):
+    """Test All Assembly Preview, refined in background"""
+    if apis is None:
+        apis = supported_apis()
+
+    tests = {
+        # whole assembly refined
+        "preview": ([], ["LeleAllAssembly"]),
+        # only the selected part refined
+        "preview_refine": (["-T", "-rf", "LeleTopAssembly"], ["LeleTopAssembly"]),
+    }
+    for test, (args, refined) in tests.items():
+        for api in apis:
+            outdir = os.path.join(DEFAULT_TEST_DIR, __name__, test, api)
+            solid, _ = main(args=args + ["--preview", "-o", outdir, "-i", api, "-odoff"])
+            self.assertTrue(os.path.isdir(os.path.join(outdir, "LeleAllAssembly_preview")))
+            self.assertEqual(len(solid.refine_procs), len(refined))
+            for proc in solid.refine_procs:
+                self.assertEqual(proc.wait(timeout=REFINE_TIMEOUT), 0)
+            for name in refined:
+                self.assertTrue(os.path.isfile(os.path.join(outdir, name, name + ".stl")))
+
+
+def test_all_assembly_preview_mock(self):
+    """Test All Assembly Preview Mock"""
+    test_all_assembly_preview(self, apis=["mock"])
+
+
 if __name__ == "__main__":
     main()
@@ -49,9 +49,8 @@ class LeleBase(Solid):
         super().configure()
         # super().gen_full()
 
-    def export_args(self):
-        super().export_args()
-        self.export_configuration()
+    def export_args(self) -> list[str]:
+        return super().export_args() + [self.export_configuration()]
 
     def has_configuration(self):
         """True if pylele has configuration class"""
@@ -64,11 +63,11 @@ class LeleBase(Solid):
         if not self.has_configuration():
             self.configure()
 
-    def export_configuration(self):
+    def export_configuration(self) -> str:
         """Export Pylele Configuration"""
 
         self.configure_if_hasnt()
-        export_dict2text(
+        return export_dict2text(
             outpath=self._make_out_path(),
             fname=self.fileNameBase + "_cfg",
             dictdata=self.cfg,
@@ -95,10 +94,10 @@ class LeleBase(Solid):
 
         return cli
 
-    def export_stl(self, out_path=None) -> None:
+    def export_stl(self, out_path=None, archive=None) -> None:
         """Generate .stl output file"""
         self.configure_if_hasnt()
-        return super().export_stl(out_path=out_path)
+        return super().export_stl(out_path=out_path, archive=archive)
 
     def gen_full(self):
         """Generate full shape """
@@ -12,7 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 import argparse
 
 from b13d.api.core import Shape
-from b13d.api.solid import main_maker, test_loop, Implementation
+from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.config import LeleBodyType
 from pylele.pylele2.base import LeleBase
 
@@ -52,12 +52,12 @@ def pylele_chamber_parser(parser=None) -> argparse.ArgumentParser:
 
 def gen_extruded_oval(api, x1, x2, y_width, z_thick):
     """ Generate an oval shaped vertical extrusion"""
-    chm = api.cylinder_z(z_thick, rad=y_width / 2).mv(x1, 0, 0)
-    chm += api.cylinder_z(z_thick, rad=y_width / 2).mv(x2, 0, 0)
+    oval = api.circle2d(y_width / 2).mv(x1, 0)
+    oval += api.circle2d(y_width / 2).mv(x2, 0)
     box_len = abs(x1 - x2)
     box_pos = (x1 + x2) / 2
-    chm += api.box(box_len, y_width, z_thick).mv(box_pos, 0, 0)
-    return chm
+    oval += api.rect2d(box_len, y_width).mv(box_pos, 0)
+    return oval.extrude(z_thick).mv(0, 0, -z_thick / 2)
 
 class LeleChamber(LeleBase):
     """Pylele Chamber Generator class"""
@@ -77,8 +77,6 @@ class LeleChamber(LeleBase):
             rotY = 0.5
         jcTol = self.api.tolerance()
         rad = self.cfg.chmWth / 2
-        frontRat = self.cfg.chmFront / rad
-        backRat = self.cfg.chmBack / rad
         topChmRat = topRat * 3 / 4
 
         if self.cli.body_type == LeleBodyType.TRAVEL:
@@ -90,34 +88,12 @@ class LeleChamber(LeleBase):
             chm = chm.mv(jcTol, 0, -self.cli.flat_body_thickness / 2)
 
         else:
-            topFront = (
-                self.api.sphere_quadrant(rad, True, True)
-                .scale(frontRat, 1, topChmRat)
+            # front is towards -x, the top is flatter than the bottom
+            chm = self.api.ellipsoid_sector(
+                rx=(self.cfg.chmFront, self.cfg.chmBack),
+                ry=(rad, rad),
+                rz=(rad * botRat, rad * topChmRat),
             )
-            topBack = (
-                self.api.sphere_quadrant(rad, True, False)
-                .scale(backRat, 1, topChmRat)
-            )
-            botFront = (
-                self.api.sphere_quadrant(rad, False, True)
-                .scale(frontRat, 1, botRat)
-            )
-            botBack = (
-                self.api.sphere_quadrant(rad, False, False)
-                .scale(backRat, 1, botRat)
-            )
-
-            if self.cli.implementation == Implementation.BLENDER:
-                topFront <<= ( jcTol, 0, -jcTol)
-                topBack  <<= ( jcTol, 0, -jcTol)
-                botFront <<= (-jcTol, 0,  jcTol)
-                botBack  <<= (-jcTol, 0,  jcTol)
-            else:
-                topFront <<= ( jcTol, 0, -jcTol)
-                topBack  <<= (     0, 0, -jcTol)
-                botFront <<= ( jcTol, 0,      0)
-
-            chm = topFront + topBack + botFront + botBack
 
         if rotY != 0:
             chm = chm.rotate_y(rotY)
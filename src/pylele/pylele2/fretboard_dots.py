@@ -46,6 +46,8 @@ def pylele_dots_parser(parser=None):
 
 class LeleFretboardDots(LeleBase):
     """Pylele Fretboard Dots Generator class"""
+    # flush inlays, their outline barely shows on the fretboard
+    importance = 0.25
 
     def gen(self) -> Shape:
         """Generate Fretboard Dots"""
@@ -42,26 +42,36 @@ def pylele_frets_parser(parser=None):
                     )
     return parser
 
-def gen_fret(api:ShapeAPI, y, h, ftype:FretType = FretType.ROUND):
-    """ Generate a fret """
+def gen_frets(api:ShapeAPI, positions: list[tuple[float, float, float]], h, ftype:FretType = FretType.ROUND):
+    """ Generate frets at (x, half length, z) positions, the frets must not overlap """
 
-    # main fret rod
-    fret = api.cylinder_y(2 * y, h)
-    # cut rod angles
+    # every fret is the same profile stretched along y, so each piece is
+    # generated once and placed for all the frets, and cut or joined once
+    stretched = [(x, 0, z, 1, y, 1) for x, y, z in positions]
+
+    # main fret rods
+    frets = api.instances(api.cylinder_y(2, h), stretched)
+    # cut rod angles, narrowed to the rod so neighbouring frets are not reached
     d = 4*h
-    fret -= api.box( d, d, d).rotate_x(45).mv(0, -y, d/2)
-    fret -= api.box( d, d, d).rotate_x(45).mv(0,  y, d/2)
+    edge = api.box(2*h + api.tolerance(), d, d).rotate_x(45).mv(0, 0, d/2)
+    frets -= api.instances(edge, [(x, side*y, z) for x, y, z in positions for side in (-1, 1)])
 
     if ftype == FretType.WIRE:
         # cut bottom
-        fret -= api.box(2*h, 2*y, h).mv(0,0,-h/2)
+        frets -= api.instances(api.box(2*h, 2, h).mv(0,0,-h/2), stretched)
         # generate fret wire hole
-        fret += api.box(FRET_WIRE_WIDTH, 2*y, h).mv(0,0,-h/2)
+        frets += api.instances(api.box(FRET_WIRE_WIDTH, 2, h).mv(0,0,-h/2), stretched)
 
-    return fret
+    return frets
+
+def gen_fret(api:ShapeAPI, y, h, ftype:FretType = FretType.ROUND):
+    """ Generate a fret """
+    return gen_frets(api, [(0, y, 0)], h, ftype)
 
 class LeleFrets(LeleBase):
     """Pylele Frets Generator class"""
+    # thin cylinders along the neck, faceting hardly shows at their radius
+    importance = 0.25
 
     def gen(self) -> Shape:
         """Generate Frets"""
@@ -79,22 +89,20 @@ class LeleFrets(LeleBase):
         fx = 0
         gap = (scLen / 2) / accumDiv(1, 12, SEMI_RATIO)
         count = 0
-        frets =  None
+        positions = []
         while (fx < (fbLen - gap - 2 * fHt)):
             fx = fx + gap
             fy = fWth / 2 + math.tan(radians(wideAng)) * fx
             fz = fbTck + math.tan(radians(riseAng)) * fx
 
-            fret = gen_fret(api=self.api, y=fy, h=fHt, ftype=self.cli.fret_type)
-            fret <<= (fx, 0, fz)
-
-            frets = fret + frets
+            positions.append((fx, fy, fz))
 
             gap = gap / SEMI_RATIO
             count += 1
             if count > maxFrets:  # prevent runaway loop
                 break
 
+        frets = gen_frets(api=self.api, positions=positions, h=fHt, ftype=self.cli.fret_type)
         return frets.set_color(ColorEnum.LITE_GRAY)
 
     def gen_parser(self, parser=None):
@@ -49,14 +49,14 @@ class LeleSpines(LeleBase):
         spWth = self.cfg.SPINE_WTH + 2*cutAdj
         fspTck = self.cfg.FRETBD_SPINE_TCK  + 2*self.api.tolerance()
 
-        shape = None
+        outline = None
         for y_spine in self.cfg.spineY:
-            spine = self.api.box(spLen, spWth, spHt)
-            spine <<= (spX + spLen/2, y_spine, -fspTck - spHt/2)
-            
-            shape = spine + shape
-        
-        return shape
+            spine = self.api.rect2d(spLen, spWth)
+            spine <<= (spX + spLen/2, y_spine)
+
+            outline = spine + outline
+
+        return outline.extrude(-spHt).mv(0, 0, -fspTck)
 
 
 def main(args=None):
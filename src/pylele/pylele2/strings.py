@@ -17,6 +17,8 @@ from pylele.pylele2.base import LeleBase
 
 class LeleStrings(LeleBase):
     """Pylele Strings Generator class"""
+    # thin stand-ins of the strings, shown for reference or cut as holes
+    importance = 0.25
 
     def gen(self) -> Shape:
         """Generate Strings"""
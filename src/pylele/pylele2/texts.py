@@ -55,6 +55,8 @@ def pylele_texts_parser(parser=None):
 
 class LeleTexts(LeleBase):
     """Pylele Texts Generator class"""
+    # font outlines are already polygons, few curved surfaces to subdivide
+    importance = 0.25
     TEXT_TCK = 30
 
     def gen(self) -> Shape:
@@ -76,7 +76,12 @@ class PyleleTestMethods(unittest.TestCase):
         test_bottom_assembly,
         test_bottom_assembly_mock,
     )
-    from pylele.pylele2.all_assembly import test_all_assembly, test_all_assembly_mock
+    from pylele.pylele2.all_assembly import (
+        test_all_assembly,
+        test_all_assembly_mock,
+        test_all_assembly_preview,
+        test_all_assembly_preview_mock,
+    )
 
     def test_zz_report(self):
         """ Generate Test Report """